@@ -5,39 +5,86 @@ FastAPI backend for the CubeSat telemetry simulation system.
 Provides REST API endpoints for telemetry data, satellite mode, and fault injection.
 """
 
-import asyncio
 import json
+import logging
+import multiprocessing
+import operator
+import os
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import orjson
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.concurrency import run_in_threadpool
+from typing_extensions import TypedDict
 
 from telemetry import (
     get_simulator, 
-    run_telemetry_stream, 
+    run_telemetry_stream_sync, 
     TelemetrySimulator, 
     SatelliteMode,
-    TelemetryData
+    TelemetryData,
+    MODE_STR
 )
 
+logger = logging.getLogger(__name__)
+
 # Global simulator instance
 simulator: Optional[TelemetrySimulator] = None
 
+# Latest streamed frame, pre-serialized once per tick as (full JSON, downlink JSON).
+# Swapped as a single tuple so readers always see a consistent pair.
+latest_frame_json: Optional[Tuple[bytes, bytes]] = None
+
+# Set once the stream has published its first frame; startup waits on it
+first_frame_published = threading.Event()
+
+# Longest startup wait for the first frame (seconds)
+FIRST_FRAME_TIMEOUT = 5.0
+
+# Cache lifetimes (seconds) for pre-serialized endpoint bodies.
+# Underlying state changes at most once per telemetry tick.
+CACHE_TTLS = {
+    "logs": 5.0,
+    "mode": 1.0,
+    "recovery_status": 2.0,
+    "recovery_history": 5.0,
+}
+
+# Endpoints returning growing lists, serialized off the event loop on cache misses
+THREADPOOL_SERIALIZED = {"logs", "recovery_history"}
+
+# orjson options for all response bodies: naive datetimes are UTC, and UTC is written
+# with a "Z" suffix, the same as the Pydantic-rendered models
+JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
 # Pydantic models for request/response
 class FaultInjectionRequest(BaseModel):
     type: str = Field(..., description="Type of fault to inject")
     duration: float = Field(..., description="Duration of fault in seconds")
 
-class FaultInjectionResponse(BaseModel):
+class FastModel(BaseModel):
+    """Base for response models: immutable, lenient to extra keys, built from trusted data"""
+    model_config = ConfigDict(
+        extra='ignore',
+        frozen=True,
+        ser_json_timedelta='iso8601',
+        arbitrary_types_allowed=True
+    )
+
+class FaultInjectionResponse(FastModel):
     message: str
     fault_type: str
     duration: float
     telemetry: Dict[str, Any]
 
-class TelemetryResponse(BaseModel):
+class TelemetryResponse(FastModel):
     timestamp: datetime
     battery_voltage_v: float
     battery_current_a: float
@@ -55,7 +102,7 @@ class TelemetryResponse(BaseModel):
     mode: str
     fault_injected: bool
 
-class CriticalTelemetryResponse(BaseModel):
+class CriticalTelemetryResponse(FastModel):
     timestamp: datetime
     battery_voltage_v: float
     battery_soc_pct: float
@@ -65,47 +112,82 @@ class CriticalTelemetryResponse(BaseModel):
     mode: str
     fault_injected: bool
 
-class EventLogResponse(BaseModel):
+# Plain pass-through shapes: TypedDicts document the schema with no per-response model construction
+class EventLogResponse(TypedDict):
     timestamp: datetime
     type: str
     description: str
     data: Dict[str, Any]
 
-class ModeResponse(BaseModel):
+class ModeResponse(TypedDict):
     mode: str
     timestamp: datetime
 
+class PydanticResponse(JSONResponse):
+    """
+    JSON response rendered by the model's own serializer.
+    
+    Response models are built with model_construct() from trusted simulator data,
+    so this skips both validation and jsonable_encoder.
+    """
+    
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json(exclude_unset=True, by_alias=False).encode("utf-8")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan - start and stop background tasks"""
-    global simulator
+    global simulator, latest_frame_json
     
     # Startup
-    print("Starting SURAKSHASat telemetry simulator...")
+    logger.info("Starting SURAKSHASat telemetry simulator...")
     simulator = get_simulator()
+    simulator.add_telemetry_callback(publish_latest_frame)
     
-    # Start the telemetry stream as a background task
-    telemetry_task = asyncio.create_task(run_telemetry_stream(1.0))
+    # Opt-in: also publish frames to a shared-memory ring for out-of-process consumers
+    ring_path = os.getenv("SURAKSHA_TELEMETRY_RING")
+    if ring_path:
+        # Every worker runs its own simulator and would reset a shared ring file.
+        # Worker processes (uvicorn --workers, SURAKSHA_WORKERS) are children of the server.
+        if multiprocessing.parent_process() is not None:
+            ring_path = f"{ring_path}.{os.getpid()}"
+        simulator.enable_ring(ring_path)
     
-    print("Telemetry simulator started successfully!")
+    # Run the telemetry stream on a dedicated thread, off the event loop
+    stop_event = threading.Event()
+    telemetry_thread = threading.Thread(
+        target=run_telemetry_stream_sync,
+        args=(1.0, stop_event),
+        name="telemetry-stream",
+        daemon=True
+    )
+    telemetry_thread.start()
+    
+    # Don't serve requests until there is a frame to hand out
+    if not await run_in_threadpool(first_frame_published.wait, FIRST_FRAME_TIMEOUT):
+        logger.warning("No telemetry frame after %.0fs, serving without one", FIRST_FRAME_TIMEOUT)
+    
+    logger.info("Telemetry simulator started successfully!")
     
     yield
     
     # Shutdown
-    print("Shutting down telemetry simulator...")
-    telemetry_task.cancel()
-    try:
-        await telemetry_task
-    except asyncio.CancelledError:
-        pass
-    print("Telemetry simulator stopped.")
+    logger.info("Shutting down telemetry simulator...")
+    stop_event.set()
+    telemetry_thread.join(timeout=5.0)
+    simulator.remove_telemetry_callback(publish_latest_frame)
+    simulator.disable_ring()
+    latest_frame_json = None
+    first_frame_published.clear()
+    logger.info("Telemetry simulator stopped.")
 
 # Create FastAPI app with lifespan management
 app = FastAPI(
     title="SURAKSHASat Telemetry API",
     description="REST API for CubeSat telemetry simulation and monitoring",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware for frontend integration
@@ -117,32 +199,128 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class TTLCache:
+    """
+    In-process cache of pre-serialized JSON response bodies, keyed by endpoint.
+    
+    Entries expire after their TTL or when the caller-supplied version changes.
+    If rebuilding fails, the last good (stale) body is served instead.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Any, bytes]] = {}
+    
+    async def get_or_build(self, key: str, ttl: float, build: Callable[[], Any],
+                           version: Any = None, offload: bool = False) -> bytes:
+        """
+        Return the cached body for key, rebuilding it when expired or outdated.
+        
+        Args:
+            key: Cache key (endpoint name)
+            ttl: Time to live in seconds
+            build: Callable producing the JSON-serializable content
+            version: Optional version marker; a change invalidates the entry
+            offload: Serialize in the worker thread pool instead of on the event loop
+            
+        Returns:
+            Serialized JSON body
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now < entry[0] and entry[1] == version:
+            return entry[2]
+        
+        try:
+            # build() snapshots simulator state on the event loop; only the encoding is offloaded
+            content = build()
+            if offload:
+                body = await run_in_threadpool(orjson.dumps, content, option=JSON_OPTIONS)
+            else:
+                body = orjson.dumps(content, option=JSON_OPTIONS)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.error(f"Error rebuilding cached '{key}' response, serving stale body: {e}")
+            return entry[2]
+        
+        self._entries[key] = (now + ttl, version, body)
+        return body
+
+response_cache = TTLCache()
+
+async def cached_response(key: str, build: Callable[[], Any], version: Any = None) -> Response:
+    """Build a JSON response from the TTL cache"""
+    body = await response_cache.get_or_build(
+        key, CACHE_TTLS[key], build, version, offload=key in THREADPOOL_SERIALIZED
+    )
+    return Response(content=body, media_type="application/json")
+
 def get_simulator_instance() -> TelemetrySimulator:
     """Get the global simulator instance, raising error if not available"""
     if simulator is None:
         raise HTTPException(status_code=503, detail="Telemetry simulator not initialized")
     return simulator
 
+def latest_processed_telemetry(sim: TelemetrySimulator) -> TelemetryData:
+    """Read the newest frame from the simulator's history buffer, never generating one"""
+    telemetry = sim.latest_telemetry
+    if telemetry is None:
+        raise HTTPException(status_code=503, detail="No telemetry available yet")
+    return telemetry
+
 def telemetry_to_dict(telemetry: TelemetryData) -> Dict[str, Any]:
     """Convert TelemetryData to dictionary for JSON serialization"""
-    return {
-        "timestamp": telemetry.timestamp,
-        "battery_voltage_v": telemetry.battery_voltage_v,
-        "battery_current_a": telemetry.battery_current_a,
-        "battery_soc_pct": telemetry.battery_soc_pct,
-        "bus_5v_v": telemetry.bus_5v_v,
-        "bus_3v3_v": telemetry.bus_3v3_v,
-        "solar_array_power_w": telemetry.solar_array_power_w,
-        "payload_power_w": telemetry.payload_power_w,
-        "eps_mode": telemetry.eps_mode,
-        "battery_temp_c": telemetry.battery_temp_c,
-        "obc_board_temp_c": telemetry.obc_board_temp_c,
-        "payload_temp_c": telemetry.payload_temp_c,
-        "panel_temp_c": telemetry.panel_temp_c,
-        "rad_cps": telemetry.rad_cps,
-        "mode": telemetry.mode.value,
-        "fault_injected": telemetry.fault_injected
-    }
+    return telemetry.to_dict()
+
+def telemetry_to_json(telemetry: TelemetryData) -> bytes:
+    """Serialize TelemetryData straight to JSON bytes"""
+    return orjson.dumps(telemetry.to_dict(), option=JSON_OPTIONS)
+
+def telemetry_response(telemetry: TelemetryData) -> Response:
+    """Build a JSON response for a full telemetry frame"""
+    return Response(content=telemetry_to_json(telemetry), media_type="application/json")
+
+# Critical fields downlinked in SAFE mode, in CriticalTelemetryResponse order
+_SAFE_KEYS = (
+    "timestamp",
+    "battery_voltage_v",
+    "battery_soc_pct",
+    "battery_temp_c",
+    "obc_board_temp_c",
+    "payload_temp_c",
+    "mode",
+    "fault_injected",
+)
+_safe_fields = operator.attrgetter(*_SAFE_KEYS)
+_precision = TelemetryData._PRECISION
+
+def critical_telemetry_json(telemetry: TelemetryData) -> bytes:
+    """Serialize only the critical SAFE-mode fields, rounding just those, without building a model"""
+    timestamp, voltage, soc, battery_temp, obc_temp, payload_temp, mode, fault_injected = _safe_fields(telemetry)
+    return orjson.dumps({
+        "timestamp": timestamp,
+        "battery_voltage_v": round(voltage, _precision['battery_voltage_v']),
+        "battery_soc_pct": round(soc, _precision['battery_soc_pct']),
+        "battery_temp_c": round(battery_temp, _precision['battery_temp_c']),
+        "obc_board_temp_c": round(obc_temp, _precision['obc_board_temp_c']),
+        "payload_temp_c": round(payload_temp, _precision['payload_temp_c']),
+        "mode": MODE_STR[mode],
+        "fault_injected": fault_injected
+    }, option=JSON_OPTIONS)
+
+def publish_latest_frame(telemetry: TelemetryData):
+    """
+    Telemetry callback that serializes each streamed frame once,
+    so GET handlers only hand out the prebuilt bytes.
+    """
+    global latest_frame_json
+    full_json = telemetry_to_json(telemetry)
+    if telemetry.mode == SatelliteMode.SAFE:
+        downlink_json = critical_telemetry_json(telemetry)
+    else:
+        downlink_json = full_json
+    latest_frame_json = (full_json, downlink_json)
+    first_frame_published.set()
 
 @app.get("/")
 async def root():
@@ -170,10 +348,15 @@ async def get_latest_telemetry():
     Returns complete telemetry data including all power, thermal, and radiation parameters.
     """
     sim = get_simulator_instance()
-    telemetry = sim.get_latest_telemetry()
-    return TelemetryResponse(**telemetry_to_dict(telemetry))
+    frame = latest_frame_json
+    if frame is not None:
+        return Response(content=frame[0], media_type="application/json")
+    
+    # No frame serialized yet, fall back to the history buffer
+    telemetry = latest_processed_telemetry(sim)
+    return telemetry_response(telemetry)
 
-@app.get("/telemetry/logs", response_model=List[EventLogResponse])
+@app.get("/telemetry/logs", responses={200: {"model": List[EventLogResponse]}})
 async def get_telemetry_logs():
     """
     Get the event log (anomalies, recoveries, faults) as a JSON list.
@@ -181,18 +364,9 @@ async def get_telemetry_logs():
     Returns all logged events including anomalies, mode changes, and fault injections.
     """
     sim = get_simulator_instance()
-    events = sim.get_event_log()
-    
-    # Convert events to response format
-    return [
-        EventLogResponse(
-            timestamp=event["timestamp"],
-            type=event["type"],
-            description=event["description"],
-            data=event["data"]
-        )
-        for event in events
-    ]
+    
+    # Events are already plain dicts, re-serialize only when a new event was logged
+    return await cached_response("logs", sim.get_event_log, version=sim.logs_version)
 
 @app.get("/mode", response_model=ModeResponse)
 async def get_satellite_mode():
@@ -202,10 +376,10 @@ async def get_satellite_mode():
     Returns the current operational mode of the satellite.
     """
     sim = get_simulator_instance()
-    return ModeResponse(
-        mode=sim.current_mode.value,
+    return await cached_response("mode", lambda: ModeResponse(
+        mode=MODE_STR[sim.current_mode],
         timestamp=datetime.now(timezone.utc)
-    )
+    ))
 
 @app.get("/downlink")
 async def get_downlink_data():
@@ -217,25 +391,21 @@ async def get_downlink_data():
     Returns telemetry data filtered based on current satellite mode.
     """
     sim = get_simulator_instance()
-    telemetry = sim.get_latest_telemetry()
+    frame = latest_frame_json
+    if frame is not None:
+        return Response(content=frame[1], media_type="application/json")
+    
+    # No frame serialized yet, fall back to the history buffer
+    telemetry = latest_processed_telemetry(sim)
     
-    if sim.current_mode == SatelliteMode.NORMAL:
+    if telemetry.mode == SatelliteMode.NORMAL:
         # Return all telemetry data
-        return telemetry_to_dict(telemetry)
-    elif sim.current_mode == SatelliteMode.SAFE:
+        return telemetry_response(telemetry)
+    elif telemetry.mode == SatelliteMode.SAFE:
         # Return only critical telemetry
-        return CriticalTelemetryResponse(
-            timestamp=telemetry.timestamp,
-            battery_voltage_v=telemetry.battery_voltage_v,
-            battery_soc_pct=telemetry.battery_soc_pct,
-            battery_temp_c=telemetry.battery_temp_c,
-            obc_board_temp_c=telemetry.obc_board_temp_c,
-            payload_temp_c=telemetry.payload_temp_c,
-            mode=telemetry.mode.value,
-            fault_injected=telemetry.fault_injected
-        )
+        return Response(content=critical_telemetry_json(telemetry), media_type="application/json")
     else:  # RECOVERED mode - return all data like NORMAL
-        return telemetry_to_dict(telemetry)
+        return telemetry_response(telemetry)
 
 @app.post("/simulate/fault", response_model=FaultInjectionResponse)
 async def inject_fault(request: FaultInjectionRequest):
@@ -268,12 +438,12 @@ async def inject_fault(request: FaultInjectionRequest):
     # Get updated telemetry
     telemetry = sim.get_latest_telemetry()
     
-    return FaultInjectionResponse(
+    return PydanticResponse(FaultInjectionResponse.model_construct(
         message=f"Fault '{request.type}' injected for {request.duration} seconds",
         fault_type=request.type,
         duration=request.duration,
         telemetry=telemetry_to_dict(telemetry)
-    )
+    ))
 
 @app.get("/recovery/status")
 async def get_recovery_status():
@@ -284,18 +454,23 @@ async def get_recovery_status():
     """
     sim = get_simulator_instance()
     
-    try:
-        from recovery import get_recovery_engine
-        recovery_engine = get_recovery_engine(sim)
-        return recovery_engine.get_recovery_status()
-    except ImportError:
-        return {
-            "current_mode": sim.current_mode.value,
-            "recovery_active": False,
-            "recovery_start_time": None,
-            "active_recovery": None,
-            "recovery_history_count": 0
-        }
+    def build_status() -> Dict[str, Any]:
+        try:
+            from recovery import get_recovery_engine
+            recovery_engine = get_recovery_engine(sim)
+            # The stream thread updates recovery state under the simulator lock
+            with sim.lock:
+                return recovery_engine.get_recovery_status()
+        except ImportError:
+            return {
+                "current_mode": MODE_STR[sim.current_mode],
+                "recovery_active": False,
+                "recovery_start_time": None,
+                "active_recovery": None,
+                "recovery_history_count": 0
+            }
+    
+    return await cached_response("recovery_status", build_status)
 
 @app.get("/recovery/history")
 async def get_recovery_history():
@@ -306,24 +481,45 @@ async def get_recovery_history():
     """
     sim = get_simulator_instance()
     
-    try:
-        from recovery import get_recovery_engine
-        recovery_engine = get_recovery_engine(sim)
-        return recovery_engine.get_recovery_history()
-    except ImportError:
-        return []
+    def build_history() -> List[Dict]:
+        try:
+            from recovery import get_recovery_engine
+            recovery_engine = get_recovery_engine(sim)
+            return recovery_engine.get_recovery_history()
+        except ImportError:
+            return []
+    
+    return await cached_response("recovery_history", build_history)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     sim = get_simulator_instance()
-    return {
+    # Serialized here: a returned dict goes through jsonable_encoder, which stringifies
+    # the datetime before JSON_OPTIONS could apply
+    return Response(content=orjson.dumps({
         "status": "healthy",
         "simulator_running": sim is not None,
-        "current_mode": sim.current_mode.value if sim else "unknown",
+        "current_mode": MODE_STR[sim.current_mode] if sim else "unknown",
         "timestamp": datetime.now(timezone.utc)
-    }
+    }, option=JSON_OPTIONS), media_type="application/json")
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    
+    # telemetry.py already configured the root logger on import, so force our format
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s", force=True)
+    
+    # uvloop/httptools ship with uvicorn[standard] but uvloop is not available on Windows.
+    # Each worker runs its own simulator, so extra workers only make sense for read-heavy load.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("SURAKSHA_WORKERS", "1")),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
\ No newline at end of file
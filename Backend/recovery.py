@@ -5,18 +5,25 @@ Implements autonomous recovery strategies for CubeSat anomalies.
 Manages mode state machine and applies corrective actions based on detected anomalies.
 """
 
-import asyncio
+import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, FrozenSet, List, Optional, Any, Callable, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 import logging
 
-from telemetry import SatelliteMode, TelemetryData, TelemetrySimulator
+from telemetry import EPS_SUN_POINT, MODE_STR, SatelliteMode, TelemetryData, TelemetrySimulator
 
 logger = logging.getLogger(__name__)
 
+# Number of completed recoveries kept in the history ring buffer
+RECOVERY_HISTORY_SIZE = 256
+
+# Time spent in RECOVERED mode before resuming NORMAL operations (seconds)
+RECOVERED_HOLD_DURATION = 30.0
+
 
 class RecoveryAction(Enum):
     """Types of recovery actions that can be applied"""
@@ -27,6 +34,12 @@ class RecoveryAction(Enum):
     POWER_REDUCTION = "POWER_REDUCTION"
 
 
+# Static RECOVERY_ACTION event payloads, shared by every log entry (never mutate)
+_ACTION_EVENT_DATA: Dict[RecoveryAction, Dict[str, str]] = {
+    action: {"action": action.value} for action in RecoveryAction
+}
+
+
 @dataclass
 class RecoveryStrategy:
     """Defines a recovery strategy for a specific anomaly type"""
@@ -35,6 +48,13 @@ class RecoveryStrategy:
     actions: List[RecoveryAction]
     description: str
     recovery_duration: float = 60.0  # How long to stay in recovery mode
+    # Precomputed for O(1) membership checks on the per-tick hot path
+    _action_set: FrozenSet[RecoveryAction] = field(init=False, repr=False, compare=False)
+    _action_values: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._action_set = frozenset(self.actions)
+        self._action_values = tuple(action.value for action in self.actions)
 
 
 class RecoveryEngine:
@@ -53,15 +73,26 @@ class RecoveryEngine:
         self.simulator = simulator
         self.current_mode = SatelliteMode.NORMAL
         self.recovery_active = False
-        self.recovery_start_time = None
+        self.recovery_start_time = None  # Wall-clock time, reported in status
+        self._recovery_start_monotonic = None  # Monotonic time, used for duration math
+        # Monotonic deadline for the RECOVERED → NORMAL transition, checked every tick.
+        # Tick-driven rather than an asyncio task so the engine can run on any thread.
+        self._normal_transition_at: Optional[float] = None
         self.last_anomaly_check = time.time()
         
         # Recovery strategies for different anomaly types
         self.recovery_strategies = self._initialize_recovery_strategies()
         
+        # Modes in which every strategy is a no-op (already in its target mode),
+        # so continuously re-asserted faults skip classification entirely
+        self._recovery_noop_modes = frozenset(
+            mode for mode in SatelliteMode
+            if all(strategy.target_mode == mode for strategy in self.recovery_strategies.values())
+        )
+        
         # Recovery state tracking
         self.active_recovery = None
-        self.recovery_history: List[Dict] = []
+        self.recovery_history: deque = deque(maxlen=RECOVERY_HISTORY_SIZE)  # Oldest entries drop off
         
         # Mode transition callbacks
         self.mode_change_callbacks: List[Callable[[SatelliteMode, SatelliteMode], None]] = []
@@ -121,10 +152,10 @@ class RecoveryEngine:
             # Log mode change
             self.simulator.log_event(
                 "MODE_CHANGE", 
-                f"Mode changed from {old_mode.value} to {new_mode.value}" + (f" - {reason}" if reason else ""),
+                f"Mode changed from {MODE_STR[old_mode]} to {MODE_STR[new_mode]}" + (f" - {reason}" if reason else ""),
                 {
-                    "old_mode": old_mode.value,
-                    "new_mode": new_mode.value,
+                    "old_mode": MODE_STR[old_mode],
+                    "new_mode": MODE_STR[new_mode],
                     "reason": reason
                 }
             )
@@ -136,28 +167,30 @@ class RecoveryEngine:
                 except Exception as e:
                     logger.error(f"Error in mode change callback: {e}")
             
-            logger.info(f"Mode changed: {old_mode.value} → {new_mode.value} ({reason})")
+            logger.info(f"Mode changed: {MODE_STR[old_mode]} → {MODE_STR[new_mode]} ({reason})")
     
-    def apply_recovery_strategy(self, anomaly_type: str, anomalies: List[str]) -> bool:
+    def apply_recovery_strategy(self, anomaly_type: str, anomalies: List[str],
+                                now: Optional[float] = None) -> bool:
         """
         Apply recovery strategy for detected anomalies.
         
         Args:
             anomaly_type: Type of anomaly detected
             anomalies: List of specific anomaly descriptions
+            now: Current time.monotonic() value, captured once per tick by the caller
             
         Returns:
             True if recovery strategy was applied, False otherwise
         """
         if anomaly_type not in self.recovery_strategies:
-            logger.warning(f"No recovery strategy defined for anomaly type: {anomaly_type}")
+            logger.warning("No recovery strategy defined for anomaly type: %s", anomaly_type)
             return False
         
         strategy = self.recovery_strategies[anomaly_type]
         
         # Don't apply recovery if already in the target mode
         if self.current_mode == strategy.target_mode:
-            logger.debug(f"Already in {strategy.target_mode.value} mode, skipping recovery")
+            logger.debug("Already in %s mode, skipping recovery", MODE_STR[strategy.target_mode])
             return False
         
         logger.info(f"Applying recovery strategy for {anomaly_type}: {strategy.description}")
@@ -168,6 +201,8 @@ class RecoveryEngine:
         
         # Set recovery state
         self.recovery_active = True
+        self._normal_transition_at = None
+        self._recovery_start_monotonic = time.monotonic() if now is None else now
         self.recovery_start_time = time.time()
         self.active_recovery = {
             "strategy": strategy,
@@ -182,8 +217,8 @@ class RecoveryEngine:
             {
                 "anomaly_type": anomaly_type,
                 "strategy": strategy.description,
-                "actions": [action.value for action in strategy.actions],
-                "target_mode": strategy.target_mode.value,
+                "actions": strategy._action_values,
+                "target_mode": MODE_STR[strategy.target_mode],
                 "anomalies": anomalies
             }
         )
@@ -200,7 +235,7 @@ class RecoveryEngine:
             self.simulator.log_event(
                 "RECOVERY_ACTION",
                 "EPS mode set to SUN_POINT for power recovery",
-                {"action": "SUN_POINTING"}
+                _ACTION_EVENT_DATA[RecoveryAction.SUN_POINTING]
             )
         
         elif action == RecoveryAction.PAYLOAD_SHUTDOWN:
@@ -208,7 +243,7 @@ class RecoveryEngine:
             self.simulator.log_event(
                 "RECOVERY_ACTION",
                 "Payload shutdown initiated for thermal/power safety",
-                {"action": "PAYLOAD_SHUTDOWN"}
+                _ACTION_EVENT_DATA[RecoveryAction.PAYLOAD_SHUTDOWN]
             )
         
         elif action == RecoveryAction.SYSTEM_THROTTLING:
@@ -216,7 +251,7 @@ class RecoveryEngine:
             self.simulator.log_event(
                 "RECOVERY_ACTION",
                 "System throttling initiated for radiation protection",
-                {"action": "SYSTEM_THROTTLING"}
+                _ACTION_EVENT_DATA[RecoveryAction.SYSTEM_THROTTLING]
             )
         
         elif action == RecoveryAction.POWER_REDUCTION:
@@ -224,15 +259,16 @@ class RecoveryEngine:
             self.simulator.log_event(
                 "RECOVERY_ACTION",
                 "Power reduction initiated for emergency power management",
-                {"action": "POWER_REDUCTION"}
+                _ACTION_EVENT_DATA[RecoveryAction.POWER_REDUCTION]
             )
     
-    def check_mode_recovery(self, telemetry: TelemetryData) -> bool:
+    def check_mode_recovery(self, telemetry: TelemetryData, now: Optional[float] = None) -> bool:
         """
         Check if conditions are met to recover from SAFE mode.
         
         Args:
             telemetry: Current telemetry data
+            now: Current time.monotonic() value, captured once per tick by the caller
             
         Returns:
             True if mode recovery was applied, False otherwise
@@ -240,8 +276,14 @@ class RecoveryEngine:
         if not self.recovery_active or not self.active_recovery:
             return False
         
+        # Already in RECOVERED mode, waiting for the NORMAL transition
+        if self._normal_transition_at is not None:
+            return False
+        
         # Check if recovery duration has passed
-        recovery_duration = time.time() - self.recovery_start_time
+        if now is None:
+            now = time.monotonic()
+        recovery_duration = now - self._recovery_start_monotonic
         strategy = self.active_recovery["strategy"]
         
         if recovery_duration < strategy.recovery_duration:
@@ -250,46 +292,65 @@ class RecoveryEngine:
         # Check if anomalies have cleared
         anomalies = self.simulator.check_anomalies(telemetry)
         if anomalies:
-            logger.debug(f"Anomalies still present: {anomalies}, staying in {self.current_mode.value} mode")
+            logger.debug("Anomalies still present: %s, staying in %s mode", anomalies, MODE_STR[self.current_mode])
             return False
         
         # Anomalies have cleared, start recovery sequence
-        self._apply_mode_recovery()
+        self._apply_mode_recovery(now)
         return True
     
-    def _apply_mode_recovery(self):
+    def _apply_mode_recovery(self, now: float):
         """Apply mode recovery sequence: SAFE → RECOVERED → NORMAL"""
         if self.current_mode == SatelliteMode.SAFE:
             # Transition to RECOVERED
             self.set_mode(SatelliteMode.RECOVERED, "Anomalies cleared, entering recovery phase")
             
             # Schedule transition to NORMAL after a delay
-            asyncio.create_task(self._schedule_normal_mode_transition())
+            self._normal_transition_at = now + RECOVERED_HOLD_DURATION
             
         elif self.current_mode == SatelliteMode.RECOVERED:
             # This shouldn't happen as we schedule the transition
             logger.warning("Unexpected RECOVERED mode state")
     
-    async def _schedule_normal_mode_transition(self):
-        """Schedule transition from RECOVERED to NORMAL mode"""
-        # Wait 30 seconds in RECOVERED mode
-        await asyncio.sleep(30.0)
-        
-        if self.current_mode == SatelliteMode.RECOVERED:
-            self.set_mode(SatelliteMode.NORMAL, "Recovery phase complete, resuming normal operations")
-            self._clear_recovery_state()
+    def check_normal_mode_transition(self, now: Optional[float] = None) -> bool:
+        """
+        Complete the RECOVERED → NORMAL transition once the hold period has elapsed.
+        
+        Args:
+            now: Current time.monotonic() value, captured once per tick by the caller
+            
+        Returns:
+            True if the transition to NORMAL was applied, False otherwise
+        """
+        if self._normal_transition_at is None:
+            return False
+        
+        if now is None:
+            now = time.monotonic()
+        if now < self._normal_transition_at:
+            return False
+        
+        self._normal_transition_at = None
+        if self.current_mode != SatelliteMode.RECOVERED:
+            return False
+        
+        self.set_mode(SatelliteMode.NORMAL, "Recovery phase complete, resuming normal operations")
+        self._clear_recovery_state(now)
+        return True
     
-    def _clear_recovery_state(self):
+    def _clear_recovery_state(self, now: Optional[float] = None):
         """Clear recovery state and return to normal operations"""
         if self.active_recovery:
-            recovery_duration = time.time() - self.recovery_start_time
+            if now is None:
+                now = time.monotonic()
+            recovery_duration = now - self._recovery_start_monotonic
             
             self.simulator.log_event(
                 "RECOVERY_COMPLETE",
                 f"Recovery completed successfully after {recovery_duration:.1f} seconds",
                 {
                     "recovery_duration": recovery_duration,
-                    "final_mode": self.current_mode.value,
+                    "final_mode": MODE_STR[self.current_mode],
                     "strategy": self.active_recovery["strategy"].description
                 }
             )
@@ -304,28 +365,23 @@ class RecoveryEngine:
         
         self.recovery_active = False
         self.recovery_start_time = None
+        self._recovery_start_monotonic = None
         self.active_recovery = None
     
-    def detect_anomaly_type(self, anomalies: List[str]) -> Optional[str]:
+    def detect_anomaly_type(self, anomalies: List[Tuple[Optional[str], str]]) -> Optional[str]:
         """
         Detect the primary anomaly type from a list of anomalies.
         
         Args:
-            anomalies: List of anomaly descriptions
+            anomalies: List of (anomaly_type, description) tuples from check_anomalies
             
         Returns:
             Primary anomaly type or None if no specific type detected
         """
-        # Check for specific anomaly patterns
-        for anomaly in anomalies:
-            if "battery_voltage_v" in anomaly and ("out of range" in anomaly or "low" in anomaly.lower()):
-                return "LOW_VOLTAGE"
-            elif "temp_c" in anomaly and "out of range" in anomaly:
-                return "HIGH_TEMP"
-            elif "radiation" in anomaly.lower() and "spike" in anomaly.lower():
-                return "RADIATION_SPIKE"
-            elif "power" in anomaly.lower() and ("failure" in anomaly.lower() or "low" in anomaly.lower()):
-                return "POWER_FAILURE"
+        # First anomaly tagged with a specific type wins
+        for anomaly_type, _ in anomalies:
+            if anomaly_type:
+                return anomaly_type
         
         # Check for fault injection types
         if self.simulator.fault_active and self.simulator.fault_type:
@@ -343,17 +399,21 @@ class RecoveryEngine:
         Returns:
             Modified telemetry data with recovery actions applied
         """
+        # Capture the clock once for the whole tick
+        now = time.monotonic()
+        
         # Check for anomalies
         anomalies = self.simulator.check_anomalies(telemetry)
         
-        # Apply recovery strategies if anomalies detected
-        if anomalies:
+        # Apply recovery strategies if anomalies detected and any strategy could still act
+        if anomalies and self.current_mode not in self._recovery_noop_modes:
             anomaly_type = self.detect_anomaly_type(anomalies)
             if anomaly_type:
-                self.apply_recovery_strategy(anomaly_type, anomalies)
+                self.apply_recovery_strategy(anomaly_type, [description for _, description in anomalies], now)
         
         # Check for mode recovery
-        self.check_mode_recovery(telemetry)
+        self.check_mode_recovery(telemetry, now)
+        self.check_normal_mode_transition(now)
         
         # Apply recovery actions to telemetry
         modified_telemetry = self._apply_recovery_to_telemetry(telemetry)
@@ -370,51 +430,43 @@ class RecoveryEngine:
         Returns:
             Modified telemetry data with recovery actions applied
         """
-        # Create a copy of telemetry data
-        modified_data = {
-            "timestamp": telemetry.timestamp,
-            "battery_voltage_v": telemetry.battery_voltage_v,
-            "battery_current_a": telemetry.battery_current_a,
-            "battery_soc_pct": telemetry.battery_soc_pct,
-            "bus_5v_v": telemetry.bus_5v_v,
-            "bus_3v3_v": telemetry.bus_3v3_v,
-            "solar_array_power_w": telemetry.solar_array_power_w,
-            "payload_power_w": telemetry.payload_power_w,
-            "eps_mode": telemetry.eps_mode,
-            "battery_temp_c": telemetry.battery_temp_c,
-            "obc_board_temp_c": telemetry.obc_board_temp_c,
-            "payload_temp_c": telemetry.payload_temp_c,
-            "panel_temp_c": telemetry.panel_temp_c,
-            "rad_cps": telemetry.rad_cps,
-            "mode": self.current_mode,  # Use recovery engine's mode
-            "fault_injected": telemetry.fault_injected
-        }
+        # Only collect the fields that actually change
+        changes: Dict[str, Any] = {}
+        if telemetry.mode != self.current_mode:
+            changes["mode"] = self.current_mode  # Use recovery engine's mode
         
         # Apply recovery actions based on current mode and active recovery
         if self.current_mode == SatelliteMode.SAFE:
             # Payload shutdown in safe mode
-            modified_data["payload_power_w"] = 0.0
+            changes["payload_power_w"] = 0.0
+            solar_array_power = telemetry.solar_array_power_w
+            action_set = self.active_recovery["strategy"]._action_set if self.active_recovery else frozenset()
             
             # Sun pointing for power recovery
-            if self.active_recovery and "SUN_POINTING" in [action.value for action in self.active_recovery["strategy"].actions]:
-                modified_data["eps_mode"] = "SUN_POINT"
+            if RecoveryAction.SUN_POINTING in action_set:
+                changes["eps_mode"] = EPS_SUN_POINT
             
             # System throttling for radiation protection
-            if self.active_recovery and "SYSTEM_THROTTLING" in [action.value for action in self.active_recovery["strategy"].actions]:
-                modified_data["solar_array_power_w"] *= 0.5  # 50% reduction
+            if RecoveryAction.SYSTEM_THROTTLING in action_set:
+                solar_array_power *= 0.5  # 50% reduction
             
             # Power reduction for emergency power management
-            if self.active_recovery and "POWER_REDUCTION" in [action.value for action in self.active_recovery["strategy"].actions]:
-                modified_data["solar_array_power_w"] *= 0.3  # 70% reduction
-                modified_data["payload_power_w"] = 0.0
+            if RecoveryAction.POWER_REDUCTION in action_set:
+                solar_array_power *= 0.3  # 70% reduction
+            
+            if solar_array_power != telemetry.solar_array_power_w:
+                changes["solar_array_power_w"] = solar_array_power
+        
+        # Common NORMAL/RECOVERED path: nothing to modify
+        if not changes:
+            return telemetry
         
-        # Create new TelemetryData object
-        return TelemetryData(**modified_data)
+        return replace(telemetry, **changes)
     
     def get_recovery_status(self) -> Dict[str, Any]:
         """Get current recovery status"""
         return {
-            "current_mode": self.current_mode.value,
+            "current_mode": MODE_STR[self.current_mode],
             "recovery_active": self.recovery_active,
             "recovery_start_time": self.recovery_start_time,
             "active_recovery": self.active_recovery["strategy"].anomaly_type if self.active_recovery else None,
@@ -423,16 +475,20 @@ class RecoveryEngine:
     
     def get_recovery_history(self) -> List[Dict]:
         """Get recovery history"""
-        return self.recovery_history.copy()
+        return list(self.recovery_history)
 
 
 # Global recovery engine instance
 _recovery_engine_instance: Optional[RecoveryEngine] = None
+_recovery_engine_lock = threading.Lock()
 
 
 def get_recovery_engine(simulator: TelemetrySimulator) -> RecoveryEngine:
     """Get the global recovery engine instance"""
     global _recovery_engine_instance
     if _recovery_engine_instance is None:
-        _recovery_engine_instance = RecoveryEngine(simulator)
+        # The stream thread and request handlers may race to create it
+        with _recovery_engine_lock:
+            if _recovery_engine_instance is None:
+                _recovery_engine_instance = RecoveryEngine(simulator)
     return _recovery_engine_instance
\ No newline at end of file
@@ -9,31 +9,65 @@ Generates synthetic CubeSat telemetry in real time with:
 """
 
 import asyncio
+import threading
 import time
-import random
 import math
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Callable
+import functools
+import heapq
+import operator
+import platform
+from collections import deque
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Callable, Tuple
 from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum
 import logging
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; kernels run as plain Python without it
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class SatelliteMode(Enum):
-    """Satellite operational modes"""
-    NORMAL = "NORMAL"
-    SAFE = "SAFE"
-    RECOVERED = "RECOVERED"
+class SatelliteMode(IntEnum):
+    """Satellite operational modes (integer codes; render with MODE_STR)"""
+    NORMAL = 0
+    SAFE = 1
+    RECOVERED = 2
+
+
+# Cached mode strings: a plain dict lookup instead of the Enum .name descriptor on hot paths
+MODE_STR: Dict[SatelliteMode, str] = {mode: mode.name for mode in SatelliteMode}
+
+
+def mode_value(mode: SatelliteMode) -> str:
+    """Get the string value of a satellite mode"""
+    return MODE_STR[mode]
+
+
+# EPS mode codes carried in TelemetryData.eps_mode; render with EPS_MODE_NAMES
+EPS_MODE_NAMES = ('NORMAL', 'LOW_POWER', 'FULL_CHARGE', 'SUN_POINT')
+EPS_NORMAL, EPS_LOW_POWER, EPS_FULL_CHARGE, EPS_SUN_POINT = range(len(EPS_MODE_NAMES))
+
 
+# Reference point for converting epoch nanoseconds to datetimes
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TelemetryData:
-    """Telemetry data structure"""
-    timestamp: datetime
+    """Telemetry data structure holding raw, unrounded values"""
+    timestamp_ns: int  # Nanoseconds since the Unix epoch
     # Power/EPS parameters
     battery_voltage_v: float
     battery_current_a: float
@@ -42,7 +76,7 @@ class TelemetryData:
     bus_3v3_v: float
     solar_array_power_w: float
     payload_power_w: float
-    eps_mode: str
+    eps_mode: int  # Index into EPS_MODE_NAMES
     
     # Thermal parameters
     battery_temp_c: float
@@ -56,9 +90,226 @@ class TelemetryData:
     # Operational state
     mode: SatelliteMode
     fault_injected: bool = False
+    
+    # Decimal places float fields are rounded to at the serialization boundary
+    _PRECISION = {
+        'battery_voltage_v': 2,
+        'battery_current_a': 3,
+        'battery_soc_pct': 1,
+        'bus_5v_v': 2,
+        'bus_3v3_v': 2,
+        'solar_array_power_w': 2,
+        'payload_power_w': 2,
+        'battery_temp_c': 1,
+        'obc_board_temp_c': 1,
+        'payload_temp_c': 1,
+        'panel_temp_c': 1,
+        'rad_cps': 2,
+    }
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Frame time as an aware UTC datetime, built on demand"""
+        return _EPOCH + timedelta(microseconds=self.timestamp_ns // 1000)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-ready dictionary, rounding float fields for display"""
+        precision = self._PRECISION
+        return {
+            "timestamp": self.timestamp,
+            "battery_voltage_v": round(self.battery_voltage_v, precision['battery_voltage_v']),
+            "battery_current_a": round(self.battery_current_a, precision['battery_current_a']),
+            "battery_soc_pct": round(self.battery_soc_pct, precision['battery_soc_pct']),
+            "bus_5v_v": round(self.bus_5v_v, precision['bus_5v_v']),
+            "bus_3v3_v": round(self.bus_3v3_v, precision['bus_3v3_v']),
+            "solar_array_power_w": round(self.solar_array_power_w, precision['solar_array_power_w']),
+            "payload_power_w": round(self.payload_power_w, precision['payload_power_w']),
+            "eps_mode": EPS_MODE_NAMES[self.eps_mode],
+            "battery_temp_c": round(self.battery_temp_c, precision['battery_temp_c']),
+            "obc_board_temp_c": round(self.obc_board_temp_c, precision['obc_board_temp_c']),
+            "payload_temp_c": round(self.payload_temp_c, precision['payload_temp_c']),
+            "panel_temp_c": round(self.panel_temp_c, precision['panel_temp_c']),
+            "rad_cps": round(self.rad_cps, precision['rad_cps']),
+            "mode": MODE_STR[self.mode],
+            "fault_injected": self.fault_injected
+        }
+
+
+# Satellite modes by integer code, for decoding the structured telemetry layout
+MODE_CODES = tuple(SatelliteMode)
+
+# Structured record layout for batched telemetry, one field per TelemetryData attribute (same order)
+TELEM_DTYPE = np.dtype([
+    ('timestamp_ns', 'datetime64[ns]'),
+    ('battery_voltage_v', 'f8'),
+    ('battery_current_a', 'f8'),
+    ('battery_soc_pct', 'f8'),
+    ('bus_5v_v', 'f8'),
+    ('bus_3v3_v', 'f8'),
+    ('solar_array_power_w', 'f8'),
+    ('payload_power_w', 'f8'),
+    ('eps_mode', 'u1'),  # Index into EPS_MODE_NAMES
+    ('battery_temp_c', 'f8'),
+    ('obc_board_temp_c', 'f8'),
+    ('payload_temp_c', 'f8'),
+    ('panel_temp_c', 'f8'),
+    ('rad_cps', 'f8'),
+    ('mode', 'u1'),  # SatelliteMode code
+    ('fault_injected', '?'),
+])
 
 
-@dataclass
+def telemetry_from_frames(frames: np.ndarray) -> List[TelemetryData]:
+    """Wrap rows of a TELEM_DTYPE array as TelemetryData objects"""
+    return [
+        TelemetryData(ts, v, i, soc, b5, b33, solar, payload,
+                      eps, bt, ot, pt, nt, rad, MODE_CODES[mode], fault)
+        for ts, v, i, soc, b5, b33, solar, payload, eps, bt, ot, pt, nt, rad, mode, fault in frames.tolist()
+    ]
+
+
+# Default location and capacity of the shared-memory telemetry ring
+TELEMETRY_RING_PATH = '/dev/shm/telemetry.ring'
+TELEMETRY_RING_CAPACITY = 4096  # Records; must be a power of two
+
+# Ring file header, one cacheline of uint64 slots: [head, capacity, record size, unused...]
+_RING_HEADER_BYTES = 64
+
+# Machines whose store ordering (x86-TSO) the ring relies on in place of a release fence
+_RING_MACHINES = frozenset({'x86_64', 'amd64', 'i386', 'i686', 'x86'})
+_telemetry_record = operator.attrgetter(*TELEM_DTYPE.names)
+
+
+class TelemetryRing:
+    """
+    Single-producer ring buffer of TELEM_DTYPE records in a memory-mapped file.
+    
+    The producer writes a record, then publishes it by advancing the head counter
+    in the header cacheline. Readers, in this or another process, poll the head and
+    copy out new records without involving the producer. Only the latest capacity - 1
+    records can be read back; a reader that falls further behind loses the older ones.
+    
+    x86 only: NumPy can't issue a release fence, so the ring relies on x86 keeping
+    stores in program order. On weakly ordered CPUs (e.g. aarch64) a reader could see
+    the new head before the record bytes, so the constructor refuses to run there.
+    """
+    
+    def __init__(self, path: str = TELEMETRY_RING_PATH, capacity: int = TELEMETRY_RING_CAPACITY,
+                 create: bool = True):
+        """
+        Create or attach to a telemetry ring.
+        
+        Args:
+            path: Ring file path (ideally on a tmpfs such as /dev/shm)
+            capacity: Number of records; ignored when attaching to an existing ring
+            create: Create (and reset) the ring as its producer, or attach as a reader
+        """
+        if platform.machine().lower() not in _RING_MACHINES:
+            raise OSError(f"Telemetry ring needs x86 store ordering, not available on {platform.machine()}")
+        record_size = TELEM_DTYPE.itemsize
+        if create:
+            if capacity <= 0 or capacity & (capacity - 1):
+                raise ValueError(f"Ring capacity must be a power of two, got {capacity}")
+            mm = np.memmap(path, dtype=np.uint8, mode='w+',
+                           shape=(_RING_HEADER_BYTES + capacity * record_size,))
+            header = mm[:_RING_HEADER_BYTES].view(np.uint64)
+            header[:] = 0
+            header[1] = capacity
+            header[2] = record_size
+        else:
+            mm = np.memmap(path, dtype=np.uint8, mode='r')
+            header = mm[:_RING_HEADER_BYTES].view(np.uint64)
+            capacity = int(header[1])
+            if int(header[2]) != record_size:
+                raise ValueError(f"Ring at {path} holds {int(header[2])}-byte records, expected {record_size}")
+        
+        self.path = path
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._mm = mm
+        self._header = header
+        self._records = mm[_RING_HEADER_BYTES:_RING_HEADER_BYTES + capacity * record_size].view(TELEM_DTYPE)
+        self._head = int(header[0])
+    
+    @property
+    def head(self) -> int:
+        """Total number of records published so far"""
+        return int(self._header[0])
+    
+    def publish(self, telemetry: TelemetryData):
+        """Write one frame and make it visible to readers (producer only)"""
+        head = self._head
+        self._records[head & self._mask] = _telemetry_record(telemetry)
+        # Advance the head only after the record is written. An aligned 8-byte store
+        # is not torn on 64-bit platforms, and x86 keeps stores in program order.
+        self._head = head + 1
+        self._header[0] = self._head
+    
+    def read_since(self, cursor: int) -> Tuple[np.ndarray, int]:
+        """
+        Copy out the records published after cursor.
+        
+        Args:
+            cursor: Head value from a previous read (0 to read from the start)
+            
+        Returns:
+            Tuple of (records in publish order, new cursor)
+        """
+        head = self.head
+        # Slot head & mask is the one the producer writes next, so at most capacity - 1
+        # published records are intact at any time
+        start = max(cursor, head - self.capacity + 1)
+        frames = self._records[np.arange(start, head) & self._mask]
+        # Drop records the producer overwrote (or started overwriting) while they were being copied
+        overwritten = self.head + 1 - self.capacity - start
+        if overwritten > 0:
+            frames = frames[overwritten:]
+        return frames, head
+    
+    def poll(self, callback: Callable[[TelemetryData], None], stop_event: threading.Event,
+             interval: float = 0.1, cursor: Optional[int] = None):
+        """
+        Deliver new frames to callback until stop_event is set.
+        
+        Intended for a dedicated consumer thread, so slow consumers never hold up
+        the producer.
+        
+        Args:
+            callback: Called with each new frame as TelemetryData
+            stop_event: Event that ends polling when set
+            interval: Seconds between polls
+            cursor: Head value to start after (defaults to the current head)
+        """
+        if cursor is None:
+            cursor = self.head
+        while not stop_event.is_set():
+            frames, cursor = self.read_since(cursor)
+            for telemetry in telemetry_from_frames(frames):
+                callback(telemetry)
+            stop_event.wait(interval)
+    
+    def close(self):
+        """Flush and unmap the ring (the file itself is left for readers)"""
+        if self._mm.mode != 'r':
+            self._mm.flush()
+        self._records = self._header = self._mm = None
+
+
+# Parameters bounds-checked against HealthyRanges, with the anomaly type each one maps to
+# (None for parameters that have no dedicated recovery strategy)
+ANOMALY_CHECKS = (
+    ('battery_voltage_v', "LOW_VOLTAGE"),
+    ('battery_soc_pct', None),
+    ('battery_temp_c', "HIGH_TEMP"),
+    ('obc_board_temp_c', "HIGH_TEMP"),
+    ('payload_temp_c', "HIGH_TEMP"),
+    ('panel_temp_c', "HIGH_TEMP"),
+    ('bus_5v_v', None),
+    ('bus_3v3_v', None),
+)
+
+
+@dataclass(frozen=True)
 class HealthyRanges:
     """Healthy operating ranges for telemetry parameters"""
     battery_voltage_v: tuple = (6.6, 8.4)
@@ -70,6 +321,173 @@ class HealthyRanges:
     rad_cps: tuple = (0.1, 5)  # Normal range, spikes allowed to 80
     bus_5v_v: tuple = (4.9, 5.1)
     bus_3v3_v: tuple = (3.25, 3.40)
+    
+    def __post_init__(self):
+        # Bounds vectors in ANOMALY_CHECKS order for the vectorized check
+        names = tuple(name for name, _ in ANOMALY_CHECKS)
+        ranges = tuple(getattr(self, name) for name in names)
+        object.__setattr__(self, '_names', names)
+        object.__setattr__(self, '_ranges', ranges)
+        object.__setattr__(self, '_lows', np.array([low for low, _ in ranges], dtype=np.float64))
+        object.__setattr__(self, '_highs', np.array([high for _, high in ranges], dtype=np.float64))
+
+
+# Number of processed telemetry frames kept in the history ring buffer
+TELEMETRY_HISTORY_SIZE = 1024
+
+# Number of events retained in the event log
+EVENT_LOG_SIZE = 10_000
+
+# Shared payload for events logged without data (never mutate)
+_EMPTY_EVENT_DATA: Dict = {}
+
+
+# Fixed component order for the thermal state arrays
+_THERMAL_KEYS = ('battery_temp_c', 'obc_board_temp_c', 'payload_temp_c', 'panel_temp_c')
+
+
+@njit(cache=True, fastmath=True)
+def _step_thermal(state, targets, alpha):
+    """Advance thermal state in place by one exponential-approach step (alpha = 1 - exp(-dt/tau))."""
+    for i in range(state.shape[0]):
+        state[i] += alpha[i] * (targets[i] - state[i])
+
+
+# Compile (or load the cached kernel) at import rather than on the first tick
+_step_thermal(np.zeros(4), np.zeros(4), np.zeros(4))
+
+# Entries in the solar exposure lookup tables (a power of two, so phase wraps with a bitmask)
+SOLAR_LUT_SIZE = 4096
+
+# Pre-drawn unit uniforms backing the per-tick radiation noise (a power of two)
+_RADIATION_NOISE_SIZE = 1024
+
+# Base power parameters
+_BASE_BATTERY_VOLTAGE = 7.5
+_BASE_BATTERY_SOC = 75.0
+_BASE_SOLAR_POWER = 8.0  # Watts
+
+# Column layout of the per-tick uniform draws in generate_telemetry_batch
+_POWER_COLS = slice(0, 3)    # battery voltage offset, SOC offset, battery current
+_BUS_COLS = slice(3, 5)      # 5V bus offset, 3.3V bus offset
+_PAYLOAD_COL = 5             # payload power
+_TARGET_COLS = slice(6, 10)  # target temperatures, in _THERMAL_KEYS order
+_N_DRAWS = 10
+
+# Sampling bounds (low, high) per branch
+_CHARGING_LOW = np.array([0.1, 0.5, 0.1])
+_CHARGING_HIGH = np.array([0.3, 2.0, 0.5])
+_DISCHARGING_LOW = np.array([-0.4, -1.0, -0.8])
+_DISCHARGING_HIGH = np.array([-0.1, -0.2, -0.2])
+_BUS_LOW = np.array([-0.05, -0.02])
+_BUS_HIGH = np.array([0.05, 0.02])
+_SAFE_PAYLOAD_RANGE = (0.5, 1.0)    # Reduced power in safe mode
+_NORMAL_PAYLOAD_RANGE = (2.0, 4.0)  # Normal operation
+_SUN_TARGET_LOW = np.array([25.0, 30.0, 25.0, 40.0])  # Sun-facing side gets hot
+_SUN_TARGET_HIGH = np.array([35.0, 45.0, 40.0, 60.0])
+_ECLIPSE_TARGET_LOW = np.array([5.0, 10.0, 5.0, -40.0])  # Eclipse side gets cold
+_ECLIPSE_TARGET_HIGH = np.array([15.0, 25.0, 20.0, -20.0])
+
+# Thermal offsets added to the thermal state every tick while a fault is active (_THERMAL_KEYS order)
+_FAULT_THERMAL_OFFSETS: Dict[str, np.ndarray] = {
+    "HIGH_TEMP": np.array([20.0, 25.0, 0.0, 0.0]),
+}
+
+
+def _apply_no_fault(frames: np.ndarray, uniform: Callable) -> None:
+    """Fault applier for fault types with no direct effect on frame columns"""
+
+
+def _solar_tables(sun_ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tabulate sunlight and solar exposure over SOLAR_LUT_SIZE orbital phase steps.
+    
+    Returns:
+        Tuple of (sunlight mask, irradiance factor) lookup tables
+    """
+    lut_phase = np.linspace(0.0, 1.0, SOLAR_LUT_SIZE, endpoint=False)
+    sun_lut = lut_phase < sun_ratio
+    ramp_up = np.clip(lut_phase / 0.1, 0.0, 1.0)  # Transitioning from eclipse to sun
+    ramp_down = np.clip((sun_ratio - lut_phase) / 0.1, 0.0, 1.0)  # Sun to eclipse
+    return sun_lut, np.where(sun_lut, np.minimum(ramp_up, ramp_down), 0.0)
+
+
+# Unit uniforms consumed per tick by the specialized tick kernel, drawn in blocks of ticks
+_TICK_DRAWS = 10
+_TICK_DRAW_BLOCK = 1024  # Power of two
+_TICK_SIGNATURE = 'void(float64[::1], float64[::1], float64, float64, float64, float64[::1], float64[::1])'
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _advance_tick(state, u, elapsed, orbital_period, sun_ratio, solar_lut, alpha,
+                  payload_low, payload_high, thermal_offset, out):
+    """
+    Per-tick physics shared by the live tick kernel and the replay kernel.
+    
+    Maps _TICK_DRAWS unit uniforms u onto the sampling ranges of generate_telemetry_array,
+    writes the first 12 float columns of _REPLAY_COLUMNS (everything up to but excluding
+    rad_cps) into out, and advances the thermal state in place. Inlined into its callers,
+    so constants they close over still fold.
+    """
+    # Orbital position and solar exposure
+    phase = (elapsed % orbital_period) / orbital_period
+    in_sun = phase < sun_ratio
+    lut_size = solar_lut.shape[0]
+    solar = _BASE_SOLAR_POWER * solar_lut[int(phase * lut_size) & (lut_size - 1)]
+    
+    # Battery and buses, charging if significant solar power
+    if solar > 2.0:
+        lo = _CHARGING_LOW
+        hi = _CHARGING_HIGH
+    else:
+        lo = _DISCHARGING_LOW
+        hi = _DISCHARGING_HIGH
+    soc = min(100.0, max(20.0, _BASE_BATTERY_SOC + lo[1] + u[1] * (hi[1] - lo[1])))
+    out[0] = _BASE_BATTERY_VOLTAGE + lo[0] + u[0] * (hi[0] - lo[0])
+    out[1] = lo[2] + u[2] * (hi[2] - lo[2])
+    out[2] = soc
+    out[3] = 5.0 + _BUS_LOW[0] + u[3] * (_BUS_HIGH[0] - _BUS_LOW[0])
+    out[4] = 3.3 + _BUS_LOW[1] + u[4] * (_BUS_HIGH[1] - _BUS_LOW[1])
+    out[5] = solar
+    out[6] = payload_low + u[5] * (payload_high - payload_low)
+    out[7] = EPS_LOW_POWER if soc < 30 else (EPS_FULL_CHARGE if soc > 90 else EPS_NORMAL)
+    
+    # Thermal lag toward the sun/eclipse target (targets staged in the temperature columns)
+    if in_sun:
+        tlo = _SUN_TARGET_LOW
+        thi = _SUN_TARGET_HIGH
+    else:
+        tlo = _ECLIPSE_TARGET_LOW
+        thi = _ECLIPSE_TARGET_HIGH
+    temps = out[8:12]
+    for i in range(4):
+        temps[i] = tlo[i] + u[6 + i] * (thi[i] - tlo[i])
+    _step_thermal(state, temps, alpha)
+    for i in range(4):
+        state[i] += thermal_offset[i]
+        temps[i] = state[i]
+
+
+@functools.lru_cache(maxsize=None)
+def _make_tick(orbital_period: float, sun_ratio: float, alpha: Tuple[float, ...]):
+    """
+    Build a single-tick telemetry kernel specialized for one orbit and thermal model.
+    
+    The orbit constants, the solar lookup table and the thermal step factors (alpha
+    for dt = 1 s, as in TelemetrySimulator._alpha_vec) are closed over, so the compiler
+    folds them into constants; the physics itself is _advance_tick. Compilation happens
+    here, against an explicit signature, and kernels are shared by simulators with the
+    same constants.
+    """
+    alpha_vec = np.array(alpha)
+    solar_lut = _solar_tables(sun_ratio)[1]
+    
+    @njit(_TICK_SIGNATURE, fastmath=True)
+    def _tick(state, u, elapsed, payload_low, payload_high, thermal_offset, out):
+        _advance_tick(state, u, elapsed, orbital_period, sun_ratio, solar_lut, alpha_vec,
+                      payload_low, payload_high, thermal_offset, out)
+    
+    return _tick
 
 
 class TelemetrySimulator:
@@ -87,57 +505,175 @@ class TelemetrySimulator:
         """
         self.orbital_period = orbital_period_minutes * 60  # Convert to seconds
         self.sun_eclipse_ratio = 0.6  # 60% sun, 40% eclipse
+        
+        # Solar exposure is a function of orbital phase only: tabulate it once
+        self._sun_lut, self._solar_lut = _solar_tables(self.sun_eclipse_ratio)
+        self._phase_scale = SOLAR_LUT_SIZE / self.orbital_period
         self.healthy_ranges = HealthyRanges()
         
+        # Vectorized anomaly check: fields read in the same order as the HealthyRanges bound vectors
+        self._check_types = tuple(anomaly_type for _, anomaly_type in ANOMALY_CHECKS)
+        self._check_values = operator.attrgetter(*self.healthy_ranges._names)
+        
+        # Per-instance random generator, with its samplers bound once for local use in hot paths
+        self._rng = np.random.default_rng()
+        self._uniform = self._rng.uniform
+        self._random = self._rng.random
+        self._geometric = self._rng.geometric
+        
         # Simulation state
         self.start_time = time.time()
         self.current_mode = SatelliteMode.NORMAL
         self.fault_active = False
         self.fault_type = None
         
-        # Thermal state (for lag modeling)
-        self.thermal_state = {
-            'battery_temp_c': 20.0,
-            'obc_board_temp_c': 25.0,
-            'payload_temp_c': 22.0,
-            'panel_temp_c': -20.0
-        }
+        # Pending fault expiries as a min-heap of (monotonic deadline, fault id), drained by
+        # a single timer task; only the expiry of the most recent fault clears it
+        self._fault_expiries: List[Tuple[float, int]] = []
+        self._fault_id = 0
+        self._fault_wheel_task: Optional[asyncio.Task] = None
+        self._fault_wheel_wakeup: Optional[asyncio.Event] = None
         
-        # Thermal time constants (seconds)
-        self.thermal_constants = {
-            'battery_temp_c': 300.0,      # 5 minutes
-            'obc_board_temp_c': 180.0,    # 3 minutes
-            'payload_temp_c': 240.0,      # 4 minutes
-            'panel_temp_c': 60.0          # 1 minute (fastest)
+        # Fault effects on generated frame columns, dispatched on fault_type
+        # (HIGH_TEMP acts on the thermal state instead, see _FAULT_THERMAL_OFFSETS)
+        self._fault_appliers: Dict[str, Callable[[np.ndarray, Callable], None]] = {
+            "LOW_VOLTAGE": self._apply_low_voltage,
+            "RADIATION_SPIKE": self._apply_radiation_spike,
+            "POWER_FAILURE": self._apply_power_failure,
         }
         
+        # Thermal state (for lag modeling), in _THERMAL_KEYS order
+        self.thermal_state = np.array([
+            20.0,   # battery
+            25.0,   # OBC board
+            22.0,   # payload
+            -20.0   # panel
+        ], dtype=np.float64)
+        
+        # Thermal time constants (seconds), in _THERMAL_KEYS order
+        self.thermal_constants = np.array([
+            300.0,  # 5 minutes
+            180.0,  # 3 minutes
+            240.0,  # 4 minutes
+            60.0    # 1 minute (fastest)
+        ], dtype=np.float64)
+        # Per-step smoothing factors for the current dt. After changing the constants, call
+        # _recompute_alpha and _build_tick: the live tick kernel has the factors baked in.
+        self._recompute_alpha(1.0)
+        
         # Radiation spike parameters
         self.radiation_spike_probability = 0.001  # 0.1% chance per update
         self.radiation_spike_duration = 30.0      # 30 seconds
         self.radiation_spike_start = None
+        # Idle ticks until the next spike: one geometric draw instead of a Bernoulli trial per tick
+        self._ticks_to_next_spike = int(self._geometric(self.radiation_spike_probability))
+        self._rad_noise: List[float] = []  # Filled on the first tick
+        self._rad_noise_i = 0
         
-        # Callbacks for external systems
+        # Callbacks for external systems (stored pre-wrapped, see add_telemetry_callback)
         self.telemetry_callbacks: List[Callable[[TelemetryData], None]] = []
         
+        # Ring buffer of processed frames, shared between the producer loop and readers.
+        # Producer appends, readers take history[-1]; oldest frames drop off automatically.
+        self.telemetry_history: deque = deque(maxlen=TELEMETRY_HISTORY_SIZE)
+        
+        # Optional shared-memory ring that processed frames are also published to
+        self.ring: Optional[TelemetryRing] = None
+        
+        # Serializes frame generation between the stream thread and request handlers
+        self.lock = threading.Lock()
+        
         # Event log
-        self.event_log: List[Dict] = []
+        self.event_log: deque = deque(maxlen=EVENT_LOG_SIZE)
+        self.logs_version = 0  # Bumped on every new event, lets readers detect changes cheaply
+        
+        # Single-tick kernel specialized for this orbit and thermal model (1 s ticks)
+        self._build_tick()
+        self._tick_out = np.empty(12)
+        self._tick_draws = np.empty((0, _TICK_DRAWS))  # Filled on the first tick
+        self._tick_draw_i = 0
+        self._no_thermal_offset = np.zeros(len(_THERMAL_KEYS))
         
         logger.info(f"Telemetry simulator initialized with {orbital_period_minutes} min orbital period")
     
+    def enable_ring(self, path: str = TELEMETRY_RING_PATH, capacity: int = TELEMETRY_RING_CAPACITY) -> bool:
+        """
+        Publish processed frames to a shared-memory ring as well as the history buffer.
+        
+        Falls back to the in-process history only if the ring can't be created
+        (e.g. no /dev/shm, or a CPU that isn't x86).
+        
+        Returns:
+            True if the ring is active
+        """
+        try:
+            ring = TelemetryRing(path, capacity)
+        except (OSError, ValueError) as e:
+            logger.warning("Telemetry ring unavailable at %s, using in-process history only: %s", path, e)
+            return False
+        with self.lock:
+            self.ring = ring
+        logger.info("Publishing telemetry to ring %s (%d records)", path, capacity)
+        return True
+    
+    def disable_ring(self):
+        """Stop publishing to the shared-memory ring and unmap it"""
+        with self.lock:
+            ring, self.ring = self.ring, None
+        if ring is not None:
+            ring.close()
+    
+    def _publish_frame(self, telemetry: TelemetryData):
+        """Publish a processed frame to the history buffer and ring (call with lock held)"""
+        self.telemetry_history.append(telemetry)
+        if self.ring is not None:
+            self.ring.publish(telemetry)
+    
     def add_telemetry_callback(self, callback: Callable[[TelemetryData], None]):
-        """Add a callback function to be called when new telemetry is generated"""
-        self.telemetry_callbacks.append(callback)
+        """
+        Add a callback function to be called when new telemetry is generated.
+        
+        The callback is wrapped once here so a failing callback is logged without
+        stopping the stream, and the stream loop can invoke callbacks directly.
+        """
+        @functools.wraps(callback)
+        def safe_callback(telemetry: TelemetryData):
+            try:
+                callback(telemetry)
+            except Exception as e:
+                logger.error("Error in telemetry callback %r: %s", callback, e)
+        
+        self.telemetry_callbacks.append(safe_callback)
+    
+    def remove_telemetry_callback(self, callback: Callable[[TelemetryData], None]):
+        """Remove a callback previously registered with add_telemetry_callback"""
+        for wrapped in self.telemetry_callbacks:
+            # Compare by equality: bound methods are recreated on every attribute access
+            if getattr(wrapped, "__wrapped__", wrapped) == callback:
+                self.telemetry_callbacks.remove(wrapped)
+                return
+        raise ValueError(f"Telemetry callback {callback!r} is not registered")
     
-    def log_event(self, event_type: str, description: str, data: Optional[Dict] = None):
-        """Log an event to the event timeline"""
+    def log_event(self, event_type: str, description: str, data: Optional[Dict] = None,
+                  timestamp: Optional[datetime] = None):
+        """
+        Log an event to the event timeline.
+        
+        Args:
+            event_type: Event type tag
+            description: Human-readable description
+            data: Optional event payload
+            timestamp: Event time, if the caller already knows it (defaults to now)
+        """
         event = {
-            'timestamp': datetime.now(timezone.utc),
+            'timestamp': timestamp or datetime.now(timezone.utc),
             'type': event_type,
             'description': description,
-            'data': data or {}
+            'data': data or _EMPTY_EVENT_DATA
         }
         self.event_log.append(event)
-        logger.info(f"Event: {event_type} - {description}")
+        self.logs_version += 1
+        logger.info("Event: %s - %s", event_type, description)
     
     def get_orbital_phase(self) -> float:
         """
@@ -147,70 +683,104 @@ class TelemetrySimulator:
         phase = (elapsed % self.orbital_period) / self.orbital_period
         return phase
     
+    def _phase_index(self) -> int:
+        """Index of the current orbital phase into the solar lookup tables"""
+        return int((time.time() - self.start_time) * self._phase_scale) & (SOLAR_LUT_SIZE - 1)
+    
     def is_in_sunlight(self) -> bool:
         """Determine if satellite is currently in sunlight"""
-        phase = self.get_orbital_phase()
-        return phase < self.sun_eclipse_ratio
+        return bool(self._sun_lut[self._phase_index()])
     
     def get_solar_irradiance_factor(self) -> float:
         """
         Get solar irradiance factor based on orbital position.
         Returns 0.0 in eclipse, 1.0 at peak sun, with smooth transitions.
         """
-        phase = self.get_orbital_phase()
-        
-        if not self.is_in_sunlight():
-            return 0.0
+        return float(self._solar_lut[self._phase_index()])
+    
+    def _phase_batch(self, n: int, t0: Optional[float] = None, dt: float = 1.0) -> np.ndarray:
+        """
+        Orbital phase of n ticks in one vectorized pass.
         
-        # Smooth transition from eclipse to sun and back
-        if phase < 0.1:  # Transitioning from eclipse to sun
-            return phase / 0.1
-        elif phase > self.sun_eclipse_ratio - 0.1:  # Transitioning from sun to eclipse
-            return (self.sun_eclipse_ratio - phase) / 0.1
-        else:  # In full sunlight
-            return 1.0
+        Args:
+            n: Number of ticks
+            t0: Time of the first tick in seconds since the epoch (defaults to now)
+            dt: Time step between ticks in seconds
+        """
+        if t0 is None:
+            t0 = time.time()
+        elapsed = (t0 - self.start_time) + dt * np.arange(n)
+        return (elapsed % self.orbital_period) / self.orbital_period
+    
+    def _sun_mask_batch(self, phase: np.ndarray) -> np.ndarray:
+        """Sunlight mask for a vector of orbital phases"""
+        return phase < self.sun_eclipse_ratio
+    
+    def _recompute_alpha(self, dt: float):
+        """Precompute the exponential-approach factors for time step dt"""
+        self._alpha_vec = 1.0 - np.exp(-dt / self.thermal_constants)
+        self._cached_dt = dt
     
-    def update_thermal_state(self, target_temps: Dict[str, float], dt: float):
+    def _build_tick(self):
+        """(Re)build the live tick kernel from the current orbit and 1 s thermal step factors"""
+        if self._cached_dt != 1.0:
+            self._recompute_alpha(1.0)
+        self._tick = _make_tick(self.orbital_period, self.sun_eclipse_ratio,
+                                tuple(self._alpha_vec.tolist()))
+    
+    def update_thermal_state(self, target_temps: np.ndarray, dt: float):
         """
         Update thermal state with lag modeling using exponential approach.
         
         Args:
-            target_temps: Target temperatures for each component
+            target_temps: Target temperatures for each component, in _THERMAL_KEYS order
             dt: Time step in seconds
         """
-        for component, target_temp in target_temps.items():
-            if component in self.thermal_state:
-                current_temp = self.thermal_state[component]
-                tau = self.thermal_constants[component]
-                
-                # Exponential approach to target temperature
-                alpha = 1 - math.exp(-dt / tau)
-                self.thermal_state[component] = current_temp + alpha * (target_temp - current_temp)
-    
-    def generate_radiation_spike(self) -> float:
-        """Generate radiation spike if conditions are met"""
-        current_time = time.time()
-        
-        # Check if we should start a new spike
-        if (self.radiation_spike_start is None and 
-            random.random() < self.radiation_spike_probability):
+        if dt != self._cached_dt:
+            self._recompute_alpha(dt)
+        _step_thermal(self.thermal_state, target_temps, self._alpha_vec)
+    
+    def generate_radiation_spike(self, current_time: Optional[float] = None) -> float:
+        """
+        Generate radiation spike if conditions are met.
+        
+        Args:
+            current_time: Tick time in seconds since the epoch (defaults to now)
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        # Unit uniform from the pre-drawn noise buffer, refilled in one call when the cursor wraps
+        i = self._rad_noise_i & (_RADIATION_NOISE_SIZE - 1)
+        if i == 0:
+            self._rad_noise = self._random(_RADIATION_NOISE_SIZE).tolist()
+        self._rad_noise_i += 1
+        u = self._rad_noise[i]
+        
+        # Count down to the next spike while idle
+        if self.radiation_spike_start is None:
+            self._ticks_to_next_spike -= 1
+            if self._ticks_to_next_spike > 0:
+                # Normal radiation levels (0.1-5 cps)
+                return 0.1 + 4.9 * u
             self.radiation_spike_start = current_time
-            self.log_event("RADIATION_SPIKE", "Radiation spike detected", 
-                          {"spike_start": current_time})
+            self.log_event("RADIATION_SPIKE", "Radiation spike detected",
+                          {"spike_start": current_time},
+                          timestamp=datetime.fromtimestamp(current_time, timezone.utc))
         
         # Check if we're in an active spike
-        if (self.radiation_spike_start is not None and 
-            current_time - self.radiation_spike_start < self.radiation_spike_duration):
+        if current_time - self.radiation_spike_start < self.radiation_spike_duration:
             # Generate spike with random intensity (10-80 cps)
-            return random.uniform(10.0, 80.0)
-        else:
-            # End the spike
-            if self.radiation_spike_start is not None:
-                self.log_event("RADIATION_SPIKE_END", "Radiation spike ended")
-                self.radiation_spike_start = None
-            
-            # Normal radiation levels
-            return random.uniform(0.1, 5.0)
+            return 10.0 + 70.0 * u
+        
+        # End the spike and schedule the next one
+        self.log_event("RADIATION_SPIKE_END", "Radiation spike ended",
+                      timestamp=datetime.fromtimestamp(current_time, timezone.utc))
+        self.radiation_spike_start = None
+        self._ticks_to_next_spike = int(self._geometric(self.radiation_spike_probability))
+        
+        # Normal radiation levels
+        return 0.1 + 4.9 * u
     
     def inject_fault(self, fault_type: str, duration: float = 60.0):
         """
@@ -220,196 +790,282 @@ class TelemetrySimulator:
             fault_type: Type of fault to inject
             duration: Duration of fault in seconds
         """
-        self.fault_active = True
-        self.fault_type = fault_type
-        self.log_event("FAULT_INJECTED", f"Fault injected: {fault_type}", 
-                      {"fault_type": fault_type, "duration": duration})
+        # The stream thread reads both fields per frame, so swap them together under the lock
+        with self.lock:
+            self.fault_active = True
+            self.fault_type = fault_type
+            self.log_event("FAULT_INJECTED", f"Fault injected: {fault_type}", 
+                          {"fault_type": fault_type, "duration": duration})
         
-        # Schedule fault removal
-        asyncio.create_task(self._remove_fault_after_delay(duration))
+        # Schedule fault removal on the timer wheel
+        self._fault_id += 1
+        deadline = time.monotonic() + duration
+        earliest = not self._fault_expiries or deadline < self._fault_expiries[0][0]
+        heapq.heappush(self._fault_expiries, (deadline, self._fault_id))
+        
+        task = self._fault_wheel_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._fault_wheel_wakeup = asyncio.Event()
+            self._fault_wheel_task = asyncio.create_task(self._run_fault_wheel())
+        elif earliest:
+            # The wheel is sleeping toward a later deadline; let it reschedule
+            self._fault_wheel_wakeup.set()
     
-    async def _remove_fault_after_delay(self, delay: float):
-        """Remove fault after specified delay"""
-        await asyncio.sleep(delay)
-        self.fault_active = False
-        self.fault_type = None
-        self.log_event("FAULT_REMOVED", "Injected fault removed")
+    async def _run_fault_wheel(self):
+        """Sleep until the earliest pending fault expiry, clear it, repeat until none remain"""
+        expiries = self._fault_expiries
+        wakeup = self._fault_wheel_wakeup
+        while expiries:
+            delay = expiries[0][0] - time.monotonic()
+            if delay > 0:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            _, fault_id = heapq.heappop(expiries)
+            # Expiries of faults superseded by a later injection are dropped
+            if fault_id == self._fault_id and self.fault_active:
+                with self.lock:
+                    self.fault_active = False
+                    self.fault_type = None
+                    self.log_event("FAULT_REMOVED", "Injected fault removed")
+    
+    @staticmethod
+    def _apply_low_voltage(frames: np.ndarray, uniform: Callable) -> None:
+        """Battery degradation: reduced voltage and state of charge"""
+        frames['battery_voltage_v'] *= 0.7  # 30% voltage drop
+        frames['battery_soc_pct'] *= 0.6    # 40% SOC drop
+    
+    @staticmethod
+    def _apply_radiation_spike(frames: np.ndarray, uniform: Callable) -> None:
+        """Sustained high radiation counts"""
+        frames['rad_cps'] = uniform(50, 100, size=len(frames))
+    
+    @staticmethod
+    def _apply_power_failure(frames: np.ndarray, uniform: Callable) -> None:
+        """EPS failure: low bus voltage, degraded solar input, payload browned out"""
+        frames['battery_voltage_v'] *= 0.5
+        frames['solar_array_power_w'] *= 0.3
+        frames['payload_power_w'] *= 0.2
     
     def generate_telemetry(self) -> TelemetryData:
-        """Generate a single telemetry data point"""
-        current_time = datetime.now(timezone.utc)
-        solar_factor = self.get_solar_irradiance_factor()
-        is_sunlight = self.is_in_sunlight()
+        """Generate a single telemetry data point with the specialized tick kernel (same model as generate_telemetry_array)"""
+        t_ns = time.time_ns()
+        current_time = t_ns * 1e-9
         
-        # Base power parameters
-        base_battery_voltage = 7.5
-        base_battery_soc = 75.0
-        base_solar_power = 8.0  # Watts
+        # One row of pre-drawn unit uniforms per tick, redrawn a block at a time
+        k = self._tick_draw_i
+        if k == 0:
+            self._tick_draws = self._random((_TICK_DRAW_BLOCK, _TICK_DRAWS))
+        self._tick_draw_i = (k + 1) & (_TICK_DRAW_BLOCK - 1)
+        
+        fault_injected = self.fault_active
+        thermal_offset = self._no_thermal_offset
+        if fault_injected:
+            thermal_offset = _FAULT_THERMAL_OFFSETS.get(self.fault_type, thermal_offset)
+        payload_low, payload_high = (_SAFE_PAYLOAD_RANGE if self.current_mode == SatelliteMode.SAFE
+                                     else _NORMAL_PAYLOAD_RANGE)
+        out = self._tick_out
+        self._tick(self.thermal_state, self._tick_draws[k], current_time - self.start_time,
+                   payload_low, payload_high, thermal_offset, out)
+        v, i, soc, b5, b33, solar, payload, eps, bt, ot, pt, nt = out.tolist()
+        rad = self.generate_radiation_spike(current_time)
+        record = (t_ns, v, i, soc, b5, b33, solar, payload, int(eps), bt, ot, pt, nt, rad,
+                  self.current_mode, fault_injected)
+        
+        applier = self._fault_appliers.get(self.fault_type) if fault_injected else None
+        if applier is not None:
+            # Fault appliers work on frame columns; round-trip through a one-row array
+            frame = np.array([record], dtype=TELEM_DTYPE)
+            applier(frame, self._uniform)
+            return telemetry_from_frames(frame)[0]
+        return TelemetryData(*record)
+    
+    def generate_telemetry_batch(self, n: int, dt: float = 1.0) -> List[TelemetryData]:
+        """
+        Generate n consecutive telemetry data points spaced dt seconds apart.
+        
+        Args:
+            n: Number of ticks to generate
+            dt: Time step between ticks in seconds
+            
+        Returns:
+            List of telemetry data points in time order
+        """
+        return telemetry_from_frames(self.generate_telemetry_array(n, dt))
+    
+    def generate_telemetry_array(self, n: int, dt: float = 1.0) -> np.ndarray:
+        """
+        Generate n consecutive telemetry frames as a TELEM_DTYPE structured array.
+        
+        All stochastic fields are drawn with a single vectorized RNG call; only the
+        thermal lag recurrence and the radiation spike state machine step per tick.
+        
+        Args:
+            n: Number of ticks to generate
+            dt: Time step between ticks in seconds
+            
+        Returns:
+            Structured array of telemetry frames in time order
+        """
+        uniform = self._uniform
+        frames = np.empty(n, dtype=TELEM_DTYPE)
+        # One clock read for the whole batch; later ticks are integer offsets from it
+        t0_ns = time.time_ns()
+        tick_ns = t0_ns + np.arange(n, dtype=np.int64) * int(dt * 1e9)
+        frames['timestamp_ns'] = tick_ns.view('datetime64[ns]')
+        tick_times = tick_ns * 1e-9
+        
+        # Orbital position and solar exposure for every tick
+        phase = self._phase_batch(n, t0_ns * 1e-9, dt)
+        in_sun = self._sun_mask_batch(phase)
+        solar_factor = self._solar_lut[(phase * SOLAR_LUT_SIZE).astype(np.int64) & (SOLAR_LUT_SIZE - 1)]
         
         # Apply solar cycle effects
-        solar_array_power = base_solar_power * solar_factor
+        solar_array_power = frames['solar_array_power_w']
+        np.multiply(_BASE_SOLAR_POWER, solar_factor, out=solar_array_power)
         battery_charging = solar_array_power > 2.0  # Charging if significant solar power
         
-        # Battery voltage and SOC with charging/discharging
-        if battery_charging:
-            battery_voltage = base_battery_voltage + random.uniform(0.1, 0.3)
-            battery_soc = min(100.0, base_battery_soc + random.uniform(0.5, 2.0))
-        else:
-            battery_voltage = base_battery_voltage - random.uniform(0.1, 0.4)
-            battery_soc = max(20.0, base_battery_soc - random.uniform(0.2, 1.0))
+        # Select per-tick sampling bounds for each branch, then draw everything at once
+        low = np.empty((n, _N_DRAWS))
+        high = np.empty((n, _N_DRAWS))
+        charging_col = battery_charging[:, None]
+        low[:, _POWER_COLS] = np.where(charging_col, _CHARGING_LOW, _DISCHARGING_LOW)
+        high[:, _POWER_COLS] = np.where(charging_col, _CHARGING_HIGH, _DISCHARGING_HIGH)
+        low[:, _BUS_COLS] = _BUS_LOW
+        high[:, _BUS_COLS] = _BUS_HIGH
+        payload_range = _SAFE_PAYLOAD_RANGE if self.current_mode == SatelliteMode.SAFE else _NORMAL_PAYLOAD_RANGE
+        low[:, _PAYLOAD_COL], high[:, _PAYLOAD_COL] = payload_range
+        sun_col = in_sun[:, None]
+        low[:, _TARGET_COLS] = np.where(sun_col, _SUN_TARGET_LOW, _ECLIPSE_TARGET_LOW)
+        high[:, _TARGET_COLS] = np.where(sun_col, _SUN_TARGET_HIGH, _ECLIPSE_TARGET_HIGH)
+        draws = uniform(low, high)
         
+        # Battery voltage and SOC with charging/discharging (offsets are signed per branch)
+        frames['battery_voltage_v'] = _BASE_BATTERY_VOLTAGE + draws[:, 0]
+        battery_soc = frames['battery_soc_pct']
+        battery_soc[:] = np.clip(_BASE_BATTERY_SOC + draws[:, 1], 20.0, 100.0)
         # Battery current (positive = charging, negative = discharging)
-        if battery_charging:
-            battery_current = random.uniform(0.1, 0.5)
-        else:
-            battery_current = -random.uniform(0.2, 0.8)
+        frames['battery_current_a'] = draws[:, 2]
         
         # Bus voltages (regulated, stable)
-        bus_5v = 5.0 + random.uniform(-0.05, 0.05)
-        bus_3v3 = 3.3 + random.uniform(-0.02, 0.02)
+        frames['bus_5v_v'] = 5.0 + draws[:, 3]
+        frames['bus_3v3_v'] = 3.3 + draws[:, 4]
         
         # Payload power consumption
-        if self.current_mode == SatelliteMode.SAFE:
-            payload_power = random.uniform(0.5, 1.0)  # Reduced power in safe mode
-        else:
-            payload_power = random.uniform(2.0, 4.0)  # Normal operation
+        frames['payload_power_w'] = draws[:, _PAYLOAD_COL]
         
         # EPS mode
-        if battery_soc < 30:
-            eps_mode = "LOW_POWER"
-        elif battery_soc > 90:
-            eps_mode = "FULL_CHARGE"
-        else:
-            eps_mode = "NORMAL"
-        
-        # Target temperatures based on solar exposure and mode
-        if is_sunlight:
-            # Sun-facing side gets hot
-            target_panel_temp = random.uniform(40, 60)
-            target_battery_temp = random.uniform(25, 35)
-            target_obc_temp = random.uniform(30, 45)
-            target_payload_temp = random.uniform(25, 40)
-        else:
-            # Eclipse side gets cold
-            target_panel_temp = random.uniform(-40, -20)
-            target_battery_temp = random.uniform(5, 15)
-            target_obc_temp = random.uniform(10, 25)
-            target_payload_temp = random.uniform(5, 20)
-        
-        # Apply thermal lag
-        target_temps = {
-            'battery_temp_c': target_battery_temp,
-            'obc_board_temp_c': target_obc_temp,
-            'payload_temp_c': target_payload_temp,
-            'panel_temp_c': target_panel_temp
-        }
+        frames['eps_mode'] = np.where(battery_soc < 30, EPS_LOW_POWER,
+                                      np.where(battery_soc > 90, EPS_FULL_CHARGE, EPS_NORMAL))
         
-        # Update thermal state (assuming 1-second update interval)
-        self.update_thermal_state(target_temps, 1.0)
+        # Thermal lag: exponential approach to target, stepped per tick across all components
+        state = self.thermal_state
+        if dt != self._cached_dt:
+            self._recompute_alpha(dt)
+        alpha = self._alpha_vec
+        targets = np.ascontiguousarray(draws[:, _TARGET_COLS])
+        temps = np.empty((n, len(_THERMAL_KEYS)))
+        fault_injected = self.fault_active
+        thermal_offset = _FAULT_THERMAL_OFFSETS.get(self.fault_type) if fault_injected else None
+        for k in range(n):
+            _step_thermal(state, targets[k], alpha)
+            if thermal_offset is not None:
+                state += thermal_offset
+            temps[k] = state
+        for j, key in enumerate(_THERMAL_KEYS):
+            frames[key] = temps[:, j]
         
         # Generate radiation
-        rad_cps = self.generate_radiation_spike()
-        
-        # Apply fault injection
-        fault_injected = False
-        if self.fault_active:
-            fault_injected = True
-            if self.fault_type == "LOW_VOLTAGE":
-                battery_voltage *= 0.7  # 30% voltage drop
-                battery_soc *= 0.6      # 40% SOC drop
-            elif self.fault_type == "HIGH_TEMP":
-                self.thermal_state['battery_temp_c'] += 20
-                self.thermal_state['obc_board_temp_c'] += 25
-            elif self.fault_type == "RADIATION_SPIKE":
-                rad_cps = random.uniform(50, 100)
-            elif self.fault_type == "POWER_FAILURE":
-                battery_voltage *= 0.5
-                solar_array_power *= 0.3
-                payload_power *= 0.2
-        
-        # Create telemetry data
-        telemetry = TelemetryData(
-            timestamp=current_time,
-            battery_voltage_v=round(battery_voltage, 2),
-            battery_current_a=round(battery_current, 3),
-            battery_soc_pct=round(battery_soc, 1),
-            bus_5v_v=round(bus_5v, 2),
-            bus_3v3_v=round(bus_3v3, 2),
-            solar_array_power_w=round(solar_array_power, 2),
-            payload_power_w=round(payload_power, 2),
-            eps_mode=eps_mode,
-            battery_temp_c=round(self.thermal_state['battery_temp_c'], 1),
-            obc_board_temp_c=round(self.thermal_state['obc_board_temp_c'], 1),
-            payload_temp_c=round(self.thermal_state['payload_temp_c'], 1),
-            panel_temp_c=round(self.thermal_state['panel_temp_c'], 1),
-            rad_cps=round(rad_cps, 2),
-            mode=self.current_mode,
-            fault_injected=fault_injected
-        )
+        rad_cps = frames['rad_cps']
+        rad_cps[:] = [self.generate_radiation_spike(t) for t in tick_times.tolist()]
         
-        return telemetry
+        # Apply fault injection (thermal faults are applied inside the thermal step above)
+        if fault_injected:
+            self._fault_appliers.get(self.fault_type, _apply_no_fault)(frames, uniform)
+        
+        # Operational state
+        frames['mode'] = self.current_mode
+        frames['fault_injected'] = fault_injected
+        return frames
     
     def set_mode(self, mode: SatelliteMode):
         """Set the satellite operational mode"""
         if mode != self.current_mode:
-            self.log_event("MODE_CHANGE", f"Mode changed from {self.current_mode.value} to {mode.value}")
+            self.log_event("MODE_CHANGE", f"Mode changed from {MODE_STR[self.current_mode]} to {MODE_STR[mode]}")
             self.current_mode = mode
     
     def get_latest_telemetry(self) -> TelemetryData:
         """Get the latest telemetry data with recovery processing"""
-        # Generate base telemetry
-        telemetry = self.generate_telemetry()
-        
-        # Process through recovery engine if available
-        try:
-            from recovery import get_recovery_engine
-            recovery_engine = get_recovery_engine(self)
-            telemetry = recovery_engine.process_telemetry(telemetry)
-            # Update current mode to match recovery engine
-            self.current_mode = recovery_engine.current_mode
-        except ImportError:
-            # Recovery engine not available, use base telemetry
-            pass
-        
+        with self.lock:
+            # Generate base telemetry
+            telemetry = self.generate_telemetry()
+            
+            # Process through recovery engine if available
+            recovery_engine = _recovery_engine_for(self)
+            if recovery_engine is not None:
+                telemetry = recovery_engine.process_telemetry(telemetry)
+                # Update current mode to match recovery engine
+                self.current_mode = recovery_engine.current_mode
+            
+            self._publish_frame(telemetry)
         return telemetry
     
+    @property
+    def latest_telemetry(self) -> Optional[TelemetryData]:
+        """Most recent processed frame from the history buffer, without generating a new one"""
+        history = self.telemetry_history
+        return history[-1] if history else None
+    
+    def get_telemetry_history(self, limit: Optional[int] = None) -> List[TelemetryData]:
+        """Get processed telemetry frames, optionally limited to the most recent entries"""
+        if limit:
+            return list(self.telemetry_history)[-limit:]
+        return list(self.telemetry_history)
+    
     def get_event_log(self, limit: Optional[int] = None) -> List[Dict]:
         """Get the event log, optionally limited to recent entries"""
         if limit:
-            return self.event_log[-limit:]
-        return self.event_log.copy()
+            return list(islice(self.event_log, max(0, len(self.event_log) - limit), None))
+        return list(self.event_log)
     
-    def check_anomalies(self, telemetry: TelemetryData) -> List[str]:
+    def check_anomalies(self, telemetry: TelemetryData) -> List[Tuple[Optional[str], str]]:
         """
         Check telemetry against healthy ranges and return list of anomalies.
         
+        Each anomaly is tagged with its anomaly type where the failing check
+        already knows it, so consumers don't need to parse the description.
+        
         Args:
             telemetry: Telemetry data to check
             
         Returns:
-            List of anomaly descriptions
+            List of (anomaly_type, description) tuples; anomaly_type is None
+            for out-of-range parameters with no matching recovery strategy
         """
-        anomalies = []
+        ranges = self.healthy_ranges
         
-        # Check each parameter against healthy ranges
-        checks = [
-            ('battery_voltage_v', telemetry.battery_voltage_v, self.healthy_ranges.battery_voltage_v),
-            ('battery_soc_pct', telemetry.battery_soc_pct, self.healthy_ranges.battery_soc_pct),
-            ('battery_temp_c', telemetry.battery_temp_c, self.healthy_ranges.battery_temp_c),
-            ('obc_board_temp_c', telemetry.obc_board_temp_c, self.healthy_ranges.obc_board_temp_c),
-            ('payload_temp_c', telemetry.payload_temp_c, self.healthy_ranges.payload_temp_c),
-            ('panel_temp_c', telemetry.panel_temp_c, self.healthy_ranges.panel_temp_c),
-            ('bus_5v_v', telemetry.bus_5v_v, self.healthy_ranges.bus_5v_v),
-            ('bus_3v3_v', telemetry.bus_3v3_v, self.healthy_ranges.bus_3v3_v),
-        ]
-        
-        for param_name, value, (min_val, max_val) in checks:
-            if value < min_val or value > max_val:
-                anomalies.append(f"{param_name} out of range: {value} (healthy: {min_val}-{max_val})")
+        # Check every parameter against its healthy range in one vectorized compare
+        values = self._check_values(telemetry)
+        frame = np.array(values, dtype=np.float64)
+        out_of_range = (frame < ranges._lows) | (frame > ranges._highs)
+        radiation_spike = telemetry.rad_cps > 80
+        if not radiation_spike and not out_of_range.any():
+            return []
+        
+        anomalies = []
+        for i in np.flatnonzero(out_of_range):
+            name = ranges._names[i]
+            min_val, max_val = ranges._ranges[i]
+            value = round(values[i], TelemetryData._PRECISION[name])
+            anomalies.append((self._check_types[i], f"{name} out of range: {value} (healthy: {min_val}-{max_val})"))
         
         # Special check for radiation (allow spikes up to 80 cps)
-        if telemetry.rad_cps > 80:
-            anomalies.append(f"radiation spike too high: {telemetry.rad_cps} cps (max allowed: 80)")
+        if radiation_spike:
+            anomalies.append(("RADIATION_SPIKE", f"radiation spike too high: {round(telemetry.rad_cps, TelemetryData._PRECISION['rad_cps'])} cps (max allowed: 80)"))
         
         return anomalies
 
@@ -426,6 +1082,202 @@ def get_simulator() -> TelemetrySimulator:
     return _simulator_instance
 
 
+# Float columns written by the fused replay kernel, in TELEM_DTYPE order
+_REPLAY_COLUMNS = TELEM_DTYPE.names[1:14]
+
+# Frame-level fault effects understood by the replay kernel (thermal faults come
+# from _FAULT_THERMAL_OFFSETS)
+_REPLAY_FAULT_CODES = {"LOW_VOLTAGE": 1, "RADIATION_SPIKE": 2, "POWER_FAILURE": 3}
+
+
+@njit(cache=True, fastmath=True)
+def _simulate_kernel(n, dt, elapsed0, orbital_period, sun_ratio, solar_lut, state, tau,
+                     thermal_offset, fault_code, payload_low, payload_high,
+                     spike_prob, spike_duration, ticks_to_spike, spike_active, spike_start,
+                     check_cols, lows, highs, rng, out, anomalies):
+    """
+    Run n ticks of generation, fault injection and anomaly checking in one pass.
+    
+    Each tick runs _advance_tick, the same physics as the live tick kernel, then
+    radiation spikes from a geometric countdown of ticks lasting spike_duration seconds
+    (spike_start is the elapsed time at which an active spike began), as in
+    generate_radiation_spike. Random draws come from the Generator rng, which numba
+    supports natively, so the plain-Python fallback never touches NumPy's global state.
+    
+    Writes _REPLAY_COLUMNS into out (n x 13) and a per-tick anomaly bitmask into
+    anomalies (bit j = check_cols[j] out of range, last bit = radiation spike).
+    Thermal and radiation state carry across ticks, so the loop is sequential.
+    """
+    n_temps = state.shape[0]
+    n_checks = check_cols.shape[0]
+    alpha = np.empty(n_temps)
+    for i in range(n_temps):
+        alpha[i] = 1.0 - math.exp(-dt / tau[i])
+    
+    u = np.empty(_TICK_DRAWS)
+    for k in range(n):
+        # Power, buses and thermal state, as in the live tick
+        elapsed = elapsed0 + k * dt
+        for i in range(_TICK_DRAWS):
+            u[i] = rng.random()
+        row = out[k]
+        _advance_tick(state, u, elapsed, orbital_period, sun_ratio, solar_lut, alpha,
+                      payload_low, payload_high, thermal_offset, row)
+        
+        # Radiation: count down to the next spike while idle, as in generate_radiation_spike
+        if not spike_active:
+            ticks_to_spike -= 1
+            if ticks_to_spike <= 0:
+                spike_active = True
+                spike_start = elapsed
+        if spike_active and elapsed - spike_start >= spike_duration:
+            spike_active = False
+            ticks_to_spike = rng.geometric(spike_prob)
+        if spike_active:
+            rad = rng.uniform(10.0, 80.0)
+        else:
+            rad = rng.uniform(0.1, 5.0)
+        
+        # Frame-level fault effects
+        if fault_code == 1:
+            row[0] *= 0.7
+            row[2] *= 0.6
+        elif fault_code == 2:
+            rad = rng.uniform(50.0, 100.0)
+        elif fault_code == 3:
+            row[0] *= 0.5
+            row[5] *= 0.3
+            row[6] *= 0.2
+        row[12] = rad
+        
+        # Anomaly bitmask against the healthy ranges
+        mask = 0
+        for j in range(n_checks):
+            value = out[k, check_cols[j]]
+            if value < lows[j] or value > highs[j]:
+                mask |= 1 << j
+        if rad > 80.0:
+            mask |= 1 << n_checks
+        anomalies[k] = mask
+
+
+def simulate_batch(n_ticks: int, seed: Optional[int] = None, dt: float = 1.0,
+                   fault_type: Optional[str] = None,
+                   simulator: Optional[TelemetrySimulator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate n_ticks headlessly in a single compiled kernel, for replay and testing.
+    
+    Starts from the given simulator's orbital position, thermal, radiation spike
+    and mode state (a fresh simulator by default) without modifying it. There is no recovery
+    engine in the loop, so the mode is held constant.
+    
+    Args:
+        n_ticks: Number of ticks to simulate
+        seed: Seed for the kernel's random stream (random if None)
+        dt: Time step between ticks in seconds
+        fault_type: Fault held active for the whole run, if any
+        simulator: Simulator to take the initial state from
+        
+    Returns:
+        Tuple of (TELEM_DTYPE frames, per-tick anomaly bitmask). Bit j of the mask
+        is set when ANOMALY_CHECKS[j] is out of range; bit len(ANOMALY_CHECKS)
+        flags a radiation spike.
+    """
+    sim = simulator if simulator is not None else TelemetrySimulator()
+    ranges = sim.healthy_ranges
+    check_cols = np.array([_REPLAY_COLUMNS.index(name) for name in ranges._names], dtype=np.int64)
+    thermal_offset = _FAULT_THERMAL_OFFSETS.get(fault_type, np.zeros(len(_THERMAL_KEYS)))
+    payload_range = _SAFE_PAYLOAD_RANGE if sim.current_mode == SatelliteMode.SAFE else _NORMAL_PAYLOAD_RANGE
+    
+    spike_active = sim.radiation_spike_start is not None
+    spike_start = sim.radiation_spike_start - sim.start_time if spike_active else 0.0
+    
+    t0_ns = time.time_ns()
+    out = np.empty((n_ticks, len(_REPLAY_COLUMNS)))
+    anomalies = np.empty(n_ticks, dtype=np.uint16)
+    _simulate_kernel(
+        n_ticks, dt, t0_ns * 1e-9 - sim.start_time, sim.orbital_period, sim.sun_eclipse_ratio,
+        sim._solar_lut, sim.thermal_state.copy(), sim.thermal_constants, thermal_offset,
+        _REPLAY_FAULT_CODES.get(fault_type, 0), payload_range[0], payload_range[1],
+        sim.radiation_spike_probability, sim.radiation_spike_duration,
+        sim._ticks_to_next_spike, spike_active, spike_start,
+        check_cols, ranges._lows, ranges._highs, np.random.default_rng(seed), out, anomalies
+    )
+    
+    frames = np.empty(n_ticks, dtype=TELEM_DTYPE)
+    frames['timestamp_ns'] = (t0_ns + np.arange(n_ticks, dtype=np.int64) * int(dt * 1e9)).view('datetime64[ns]')
+    for j, name in enumerate(_REPLAY_COLUMNS):
+        frames[name] = out[:, j]
+    frames['mode'] = sim.current_mode
+    frames['fault_injected'] = fault_type is not None
+    return frames, anomalies
+
+
+# Recovery engine factory, resolved once on first use (recovery imports this module,
+# so it can't be imported at module load)
+_NO_RECOVERY = object()
+_recovery_engine_factory = None
+
+
+def _resolve_recovery():
+    """Import the recovery engine factory once, memoizing _NO_RECOVERY if unavailable"""
+    global _recovery_engine_factory
+    try:
+        from recovery import get_recovery_engine
+        _recovery_engine_factory = get_recovery_engine
+    except ImportError:
+        _recovery_engine_factory = _NO_RECOVERY
+    return _recovery_engine_factory
+
+
+def _recovery_engine_for(simulator: TelemetrySimulator):
+    """Get the recovery engine for simulator, or None if recovery isn't available"""
+    factory = _recovery_engine_factory
+    if factory is None:
+        factory = _resolve_recovery()
+    if factory is _NO_RECOVERY:
+        return None
+    return factory(simulator)
+
+
+def _stream_tick(simulator: TelemetrySimulator, recovery_engine) -> TelemetryData:
+    """Generate, process and publish one telemetry frame"""
+    with simulator.lock:
+        # Generate new telemetry
+        telemetry = simulator.generate_telemetry()
+        
+        if recovery_engine is not None:
+            # Process telemetry through recovery engine
+            telemetry = recovery_engine.process_telemetry(telemetry)
+            
+            # Update simulator's current mode to match recovery engine
+            simulator.current_mode = recovery_engine.current_mode
+        
+        # Publish to the shared history buffer (and ring, if enabled)
+        simulator._publish_frame(telemetry)
+    
+    # Call all registered callbacks (each is wrapped to log its own errors)
+    for callback in simulator.telemetry_callbacks:
+        callback(telemetry)
+    
+    return telemetry
+
+
+def _next_tick_delay(next_deadline: float, update_interval: float) -> Tuple[float, float]:
+    """
+    Compute the sleep until the next tick deadline on the monotonic clock.
+    
+    Returns:
+        Tuple of (delay in seconds, deadline for the tick after). If the loop
+        fell behind, the missed ticks are skipped and the schedule restarts from now.
+    """
+    now = time.monotonic()
+    delay = next_deadline - now
+    if delay < 0:
+        return 0.0, now + update_interval
+    return delay, next_deadline + update_interval
+
+
 async def run_telemetry_stream(update_interval: float = 1.0):
     """
     Run the telemetry stream in the background.
@@ -435,33 +1287,47 @@ async def run_telemetry_stream(update_interval: float = 1.0):
     """
     simulator = get_simulator()
     
-    # Import recovery engine here to avoid circular imports
-    from recovery import get_recovery_engine
-    recovery_engine = get_recovery_engine(simulator)
+    recovery_engine = _recovery_engine_for(simulator)
     
+    # Sleep to a fixed monotonic deadline so the period doesn't drift by the work time
+    next_deadline = time.monotonic() + update_interval
     while True:
         try:
-            # Generate new telemetry
-            telemetry = simulator.generate_telemetry()
-            
-            # Process telemetry through recovery engine
-            telemetry = recovery_engine.process_telemetry(telemetry)
-            
-            # Update simulator's current mode to match recovery engine
-            simulator.current_mode = recovery_engine.current_mode
-            
-            # Call all registered callbacks
-            for callback in simulator.telemetry_callbacks:
-                try:
-                    callback(telemetry)
-                except Exception as e:
-                    logger.error(f"Error in telemetry callback: {e}")
-            
-            await asyncio.sleep(update_interval)
-            
+            _stream_tick(simulator, recovery_engine)
         except Exception as e:
             logger.error(f"Error in telemetry stream: {e}")
-            await asyncio.sleep(update_interval)
+        
+        delay, next_deadline = _next_tick_delay(next_deadline, update_interval)
+        await asyncio.sleep(delay)
+
+
+def run_telemetry_stream_sync(update_interval: float = 1.0, stop_event: Optional[threading.Event] = None):
+    """
+    Run the telemetry stream on the calling thread until stop_event is set.
+    
+    Intended for a dedicated thread, so per-tick simulation work never runs
+    on the event loop serving HTTP requests.
+    
+    Args:
+        update_interval: Time between telemetry updates in seconds
+        stop_event: Event that ends the loop when set
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+    simulator = get_simulator()
+    
+    recovery_engine = _recovery_engine_for(simulator)
+    
+    next_deadline = time.monotonic() + update_interval
+    while not stop_event.is_set():
+        try:
+            _stream_tick(simulator, recovery_engine)
+        except Exception as e:
+            logger.error(f"Error in telemetry stream: {e}")
+        
+        # Interruptible sleep so shutdown doesn't wait out a full interval
+        delay, next_deadline = _next_tick_delay(next_deadline, update_interval)
+        stop_event.wait(delay)
 
 
 if __name__ == "__main__":
@@ -471,15 +1337,15 @@ if __name__ == "__main__":
         
         # Add a simple callback to print telemetry
         def print_telemetry(telemetry: TelemetryData):
-            print(f"[{telemetry.timestamp}] Mode: {telemetry.mode.value}, "
-                  f"Battery: {telemetry.battery_voltage_v}V ({telemetry.battery_soc_pct}%), "
-                  f"Solar: {telemetry.solar_array_power_w}W, "
-                  f"Radiation: {telemetry.rad_cps} cps")
+            print(f"[{telemetry.timestamp}] Mode: {MODE_STR[telemetry.mode]}, "
+                  f"Battery: {telemetry.battery_voltage_v:.2f}V ({telemetry.battery_soc_pct:.1f}%), "
+                  f"Solar: {telemetry.solar_array_power_w:.2f}W, "
+                  f"Radiation: {telemetry.rad_cps:.2f} cps")
         
         simulator.add_telemetry_callback(print_telemetry)
         
-        # Inject a test fault after 10 seconds
-        asyncio.create_task(simulator.inject_fault("LOW_VOLTAGE", 30.0))
+        # Inject a test fault for 30 seconds
+        simulator.inject_fault("LOW_VOLTAGE", 30.0)
         
         # Run the telemetry stream
         await run_telemetry_stream(1.0)